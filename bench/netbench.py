@@ -0,0 +1,290 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+"""
+Scan benchmark on a simulated target network.
+
+Two network namespaces are connected by a veth pair. The target namespace holds
+the target addresses and listens on the configured open ports, so its kernel
+answers ARP, ICMP and SYN probes by itself; netem adds latency and loss.
+Every scan mode runs inside the scanner namespace and the results (time, pps,
+accuracy, CPU and peak RSS) are stored as JSON to compare across commits.
+
+Usage (as root): python3 bench/netbench.py -o results.json [-c previous.json]
+"""
+
+import argparse, json, os, re, subprocess, sys, time, datetime, threading
+
+
+ROOT_DIR     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT  = os.path.join(ROOT_DIR, 'code', 'main.py')
+SCANNER_NS   = 'nxbench_scanner'
+TARGET_NS    = 'nxbench_target'
+SCANNER_IF   = 'nxb_scan0'
+TARGET_IF    = 'nxb_tgt0'
+SUBNET       = '10.77.0'
+SCANNER_IP   = f'{SUBNET}.1'
+ANSI_CODES   = re.compile(r'\033\[[0-9;]*m')
+OPEN_PORT    = re.compile(r'Opened\s*->\s*(\d+)')
+ACTIVE_HOST  = re.compile(r'Active host: (?:IP )?(\d+\.\d+\.\d+\.\d+)')
+ERROR_LINE   = re.compile(r'^(?:Unexpected error|Error|Socket error|Traceback|Unknown command|Missing command name)\b.*$',
+                          re.MULTILINE)
+
+RESPONDER = '''
+import socket, sys, time
+sockets = list()
+for port in map(int, sys.argv[1].split(',')):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('0.0.0.0', port))
+    sock.listen(1024)
+    sockets.append(sock)
+while True: time.sleep(3600)
+'''
+
+
+class Simulated_Network:
+
+    def __init__(self, hosts:int, open_ports:list[int], latency:float, loss:float) -> None:
+        self._hosts:list[str]     = [f'{SUBNET}.{index}' for index in range(2, 2 + hosts)]
+        self._open_ports:list     = open_ports
+        self._latency:float       = latency
+        self._loss:float          = loss
+        self._responder           = None
+
+
+    def __enter__(self):
+        self._teardown()
+        try:
+            self._setup()
+        except BaseException:
+            self._teardown()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._teardown()
+        return False
+
+
+    def _setup(self) -> None:
+        run('ip', 'netns', 'add', SCANNER_NS)
+        run('ip', 'netns', 'add', TARGET_NS)
+        run('ip', 'link', 'add', SCANNER_IF, 'type', 'veth', 'peer', 'name', TARGET_IF)
+        run('ip', 'link', 'set', SCANNER_IF, 'netns', SCANNER_NS)
+        run('ip', 'link', 'set', TARGET_IF, 'netns', TARGET_NS)
+        in_ns(SCANNER_NS, 'ip', 'addr', 'add', f'{SCANNER_IP}/24', 'dev', SCANNER_IF)
+        for host in self._hosts:
+            in_ns(TARGET_NS, 'ip', 'addr', 'add', f'{host}/24', 'dev', TARGET_IF)
+        for namespace, interface in ((SCANNER_NS, SCANNER_IF), (TARGET_NS, TARGET_IF)):
+            in_ns(namespace, 'ip', 'link', 'set', 'lo', 'up')
+            in_ns(namespace, 'ip', 'link', 'set', interface, 'up')
+        in_ns(SCANNER_NS, 'ip', 'route', 'add', 'default', 'via', self._hosts[0], 'dev', SCANNER_IF)
+        self._add_impairments()
+        self._start_responder()
+
+
+    def _add_impairments(self) -> None:
+        if not self._latency and not self._loss: return
+        in_ns(TARGET_NS, 'tc', 'qdisc', 'add', 'dev', TARGET_IF, 'root', 'netem',
+              'delay', f'{self._latency}ms', 'loss', f'{self._loss}%')
+
+
+    def _start_responder(self) -> None:
+        ports           = ','.join(map(str, self._open_ports))
+        self._responder = subprocess.Popen(['ip', 'netns', 'exec', TARGET_NS, sys.executable, '-c', RESPONDER, ports])
+        time.sleep(0.5)
+
+
+    def _teardown(self) -> None:
+        if self._responder:
+            self._responder.kill()
+            self._responder.wait()
+        for namespace in (SCANNER_NS, TARGET_NS):
+            subprocess.run(['ip', 'netns', 'del', namespace], stderr=subprocess.DEVNULL)
+
+
+    def _tx_packets(self) -> int:
+        output = subprocess.run(['ip', '-n', SCANNER_NS, '-s', '-j', 'link', 'show', SCANNER_IF],
+                                stdout=subprocess.PIPE, text=True, check=True).stdout
+        return json.loads(output)[0]['stats64']['tx']['packets']
+
+
+
+class Benchmark:
+
+    def __init__(self, arguments:argparse.Namespace) -> None:
+        self._args:argparse.Namespace = arguments
+        self._open_ports:list[int]    = [int(port) for port in arguments.open.split(',')]
+        self._scan_ports:list[int]    = expand_ports(arguments.ports)
+        self._results:dict            = dict()
+
+
+    def _scan_modes(self, target:str) -> dict:
+        ports = self._args.ports
+        return {
+            'pscan-stealth':   ['pscan', target, '-p', ports, '-S'],
+            'pscan-handshake': ['pscan', target, '-p', ports],
+            'pscan-random':    ['pscan', target, '-p', ports, '-S', '-r'],
+            'netmap-arp':      ['netmap'],
+            'netmap-ping':     ['netmap', '-p'],
+        }
+
+
+    def _run(self) -> dict:
+        with Simulated_Network(self._args.hosts, self._open_ports, self._args.latency, self._args.loss) as network:
+            modes = self._scan_modes(network._hosts[0])
+            for mode in self._args.modes or modes:
+                self._results[mode] = self._run_mode(network, mode, modes[mode])
+                display_mode(mode, self._results[mode])
+        return self._build_report()
+
+
+    def _run_mode(self, network:Simulated_Network, mode:str, arguments:list[str]) -> dict:
+        tx_before        = network._tx_packets()
+        output, measures = run_measured(['ip', 'netns', 'exec', SCANNER_NS, sys.executable, MAIN_SCRIPT, *arguments],
+                                        self._args.timeout)
+        measures['packets_sent'] = network._tx_packets() - tx_before
+        measures['pps']          = round(measures['packets_sent'] / measures['time_s'], 2) if measures['time_s'] else 0
+        measures.update(self._accuracy(mode, output, network._hosts))
+        measures.update(check_failure(output, measures))
+        return measures
+
+
+    def _accuracy(self, mode:str, output:str, hosts:list[str]) -> dict:
+        output = ANSI_CODES.sub('', output)
+        if mode.startswith('pscan'):
+            expected = set(self._open_ports) & set(self._scan_ports)
+            found    = {int(port) for port in OPEN_PORT.findall(output)}
+        else:
+            expected = set(hosts)
+            found    = set(ACTIVE_HOST.findall(output)) - {SCANNER_IP}
+        return {
+            'expected':  len(expected),
+            'found':     len(found & expected),
+            'false_pos': len(found - expected),
+            'recall':    round(len(found & expected) / len(expected), 4) if expected else 1.0,
+        }
+
+
+    def _build_report(self) -> dict:
+        return {
+            'commit':    git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'config': {
+                'hosts':   self._args.hosts,
+                'open':    self._open_ports,
+                'ports':   self._args.ports,
+                'latency': self._args.latency,
+                'loss':    self._args.loss,
+            },
+            'results': self._results,
+        }
+
+
+
+# FUNCTIONS ==================================================================================================
+
+def run(*command:str) -> None:
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+
+def in_ns(namespace:str, *command:str) -> None:
+    run('ip', 'netns', 'exec', namespace, *command)
+
+
+def expand_ports(spec:str) -> list[int]:
+    ports = list()
+    for part in spec.split(','):
+        start, _, end = part.partition('-')
+        ports.extend(range(int(start), int(end or start) + 1))
+    return ports
+
+
+def run_measured(command:list[str], timeout:float) -> tuple[str, dict]:
+    start   = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    timer   = threading.Timer(timeout, process.kill)
+    timer.start()
+    output  = process.stdout.read()
+    _, status, usage   = os.wait4(process.pid, 0)
+    elapsed            = time.perf_counter() - start
+    timed_out          = timer.finished.is_set()
+    process.returncode = os.waitstatus_to_exitcode(status)
+    timer.cancel()
+    return output.decode(errors='ignore'), {
+        'time_s':      round(elapsed, 3),
+        'timed_out':   timed_out,
+        'exit_code':   process.returncode,
+        'cpu_user_s':  round(usage.ru_utime, 3),
+        'cpu_sys_s':   round(usage.ru_stime, 3),
+        'peak_rss_kb': usage.ru_maxrss,
+    }
+
+
+def check_failure(output:str, measures:dict) -> dict:
+    """A scan that crashed or stopped with an error must not look like a low-recall run."""
+    error = ERROR_LINE.search(ANSI_CODES.sub('', output))
+    if error:                    reason = error.group(0).strip()
+    elif measures['timed_out']:  reason = 'Timed out'
+    elif measures['exit_code']:  reason = f'Exit code {measures["exit_code"]}'
+    else:                        return {'status': 'ok', 'error': None}
+    return {'status': 'failed', 'error': reason}
+
+
+def git_commit() -> str|None:
+    result = subprocess.run(['git', '-C', ROOT_DIR, 'rev-parse', '--short', 'HEAD'], stdout=subprocess.PIPE, text=True)
+    return result.stdout.strip() or None
+
+
+def display_mode(mode:str, result:dict) -> None:
+    if result['status'] == 'failed':
+        print(f'{mode:<16} FAILED: {result["error"]}')
+        return
+    print(f'{mode:<16} {result["time_s"]:>8.2f}s {result["pps"]:>10.1f} pps  '
+          f'recall {result["recall"]:.2%} ({result["found"]}/{result["expected"]}, {result["false_pos"]} fp)  '
+          f'cpu {result["cpu_user_s"] + result["cpu_sys_s"]:.2f}s  rss {result["peak_rss_kb"] / 1024:.1f} MB'
+          f'{"  TIMEOUT" if result["timed_out"] else ""}')
+
+
+def compare_reports(previous:dict, current:dict) -> None:
+    print(f'\nComparison with {previous.get("commit")} ({previous.get("timestamp")})')
+    for mode, result in current['results'].items():
+        old = previous['results'].get(mode)
+        if not old: continue
+        if 'failed' in (old.get('status'), result['status']):
+            print(f'{mode:<16} not comparable (failed: {old.get("status")} -> {result["status"]})')
+            continue
+        changes = [f'{key} {percent_change(old[key], result[key])}' for key in ('time_s', 'pps', 'recall', 'peak_rss_kb')]
+        print(f'{mode:<16} ' + ', '.join(changes))
+
+
+def percent_change(old:float, new:float) -> str:
+    if not old: return f'{old} -> {new}'
+    return f'{(new - old) / old:+.1%}'
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='NetXplorer scan benchmark')
+    parser.add_argument('-H', '--hosts',   type=int,   default=8,           help='Number of simulated hosts')
+    parser.add_argument('-O', '--open',    type=str,   default='22,80,443', help='Open ports on the simulated hosts')
+    parser.add_argument('-p', '--ports',   type=str,   default='1-1024',    help='Ports scanned by the pscan modes')
+    parser.add_argument('-l', '--latency', type=float, default=0,           help='Added latency in milliseconds')
+    parser.add_argument('-L', '--loss',    type=float, default=0,           help='Packet loss percentage')
+    parser.add_argument('-m', '--modes',   nargs='*',                       help='Scan modes to run (default: all)')
+    parser.add_argument('-t', '--timeout', type=float, default=600,         help='Timeout per scan mode in seconds')
+    parser.add_argument('-o', '--output',  type=str,                        help='File to store the results as JSON')
+    parser.add_argument('-c', '--compare', type=str,                        help='Previous JSON results to compare with')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    report    = Benchmark(arguments)._run()
+    if arguments.output:
+        with open(arguments.output, 'w') as file: json.dump(report, file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as file: compare_reports(json.load(file), report)
+    if any(result['status'] == 'failed' for result in report['results'].values()): sys.exit(1)
@@ -37,11 +37,19 @@ class Argument_Manager:
                 ('arg',   'host', 'Target IP/Hostname'),
                 ('bool',  '-s', '--show',    'Display all statuses, both open and closed'),
                 ('bool',  '-r', '--random',  'Use the ports in random order'),
+                ('value', '-e', '--seed',    str, 'Seed of the random order (printed when generated)'),
+                ('value', '-H', '--shard',   str, 'Scan only slice i of n of the random order (e.g. 0/4)'),
                 ('value', '-p', '--port',    str, 'Specify a port to scan'),
                 ('bool',  '-a', '--all',     'Scan all ports'),
                 ('opt',   '-d', '--delay',   'Add a delay between packet transmissions'),
                 ('bool',  '-S', '--stealth', 'Use only one packet with "SYN" flag'),
                 ('value', '-D', '--decoy',   str, 'Uses decoy method'),
+                ('bool',  '-n', '--names',   'Resolve the target hostname (PTR record)'),
+                ('bool',  '-V', '--version', 'Detect service product/version on open ports'),
+                ('value', '-c', '--checkpoint', str, 'Periodically save the scan state to a file'),
+                ('value', '-R', '--resume',     str, 'Resume an interrupted scan from a state file'),
+                ('value', '-P', '--pcap',       str, 'Process the replies of a pcap/pcapng file instead of scanning'),
+                ('value', '-L', '--probe-log',  str, 'Probe log to write while scanning or to match with --pcap'),
                 ],
             
             'banner': [
@@ -50,8 +58,43 @@ class Argument_Manager:
                 ('value',  '-p', '--port', str, 'Specify a port to grab the banners')
                 ],
 
+            'tls': [
+                ('arg',   'targets', 'Comma-separated host[:port] list or a file with one endpoint per line'),
+                ('value', '-p', '--port',     str, 'Default port for endpoints without one (443)'),
+                ('value', '-w', '--workers',  str, 'Number of concurrent connections (64)'),
+                ('value', '-t', '--timeout',  str, 'Connection timeout in seconds (5)'),
+                ('value', '-e', '--expiring', str, 'Only display certificates expiring within N days'),
+                ],
+
+            'daemon': [
+                ('value', '-s', '--socket', str, 'Unix socket path (/run/netxplorer.sock)'),
+                ('value', '-j', '--jobs',   str, 'Maximum number of concurrent jobs (8)'),
+                ('value', '-r', '--rate',   str, 'Global packet budget in packets per second'),
+                ],
+
+            'monitor': [
+                ('value', '-i', '--interval', str, 'Seconds between monitoring cycles (60)'),
+                ('value', '-p', '--port',     str, 'Ports to watch (default: common ports)'),
+                ('value', '-f', '--full',     str, 'Run a full ARP sweep every N cycles (10)'),
+                ('value', '-r', '--reprobe',  str, 'Ports reprobed per cycle, rotating across known hosts (64)'),
+                ('value', '-m', '--misses',   str, 'Missed cycles before a host is reported down (2)'),
+                ('bool',  '-b', '--banner',   'Report banner changes on open ports'),
+                ],
+
+            'passive': [
+                ('value', '-i', '--iface',   str, 'Interface to listen on (default interface)'),
+                ('value', '-r', '--read',    str, 'Replay a pcap file instead of sniffing'),
+                ('value', '-t', '--timeout', str, 'Stop sniffing after N seconds'),
+                ('value', '-m', '--max',     str, 'Maximum number of hosts kept in the table (4096)'),
+                ],
+
             'netmap': [
-                ('bool', '-p', '--ping', 'Use ping instead of an ARP packet')
+                ('bool',  '-p', '--ping',  'Use ping instead of an ARP packet'),
+                ('bool',  '-n', '--names', 'Resolve the hostnames of the active hosts (PTR records)'),
+                ('value', '-c', '--checkpoint', str, 'Periodically save the ping sweep state to a file'),
+                ('value', '-R', '--resume',     str, 'Resume an interrupted ping sweep from a state file'),
+                ('value', '-P', '--pcap',       str, 'Process the replies of a pcap/pcapng file instead of sending'),
+                ('value', '-L', '--probe-log',  str, 'Probe log to write while sweeping or to match with --pcap'),
                 ]
         }
         return DEFINITIONS[command]
\ No newline at end of file
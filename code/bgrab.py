@@ -4,9 +4,11 @@
 # Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
 
 
-import socket, ssl
-from arg_parser import Argument_Manager as ArgParser
-from display    import *
+import socket
+from arg_parser    import Argument_Manager as ArgParser
+from resolver      import resolve_hostname
+from tls_inventory import get_tls_context, parse_certificate, get_days_left
+from display       import *
 
 
 class Banner_Grabbing:
@@ -36,12 +38,13 @@ class Banner_Grabbing:
         except ConnectionRefusedError as error: print(f'{err_icon()} {yellow("Connection refused")}: {error}')
         except socket.timeout as error:         print(f'{err_icon()} {yellow("Timeout")}')
         except socket.error as error:           print(f'{err_icon()} {yellow("Socket error")}:\n{error}')
+        except ValueError as error:             print(f'{err_icon()} {yellow(str(error))}')
         except Exception as error:              print(f'{unexpected_error(error)}')
 
 
     def _grab_banners_on_the_protocol(self) -> None:
         protocol = self._protocol_dictionary().get(self._protocol)
-        host     = socket.gethostbyname(self._host)
+        host     = resolve_hostname(self._host)
         port     = self._port if self._port else protocol['port']
         protocol['func'](host, port)
 
@@ -103,24 +106,24 @@ def http_banner_grabbing(host:str, port:int) -> None:
 
 
 def https_banner_grabbing(host:str, port:int) -> None:
-    context = ssl.create_default_context()
-    context.check_hostname = False
-    context.verify_mode = ssl.CERT_NONE
-
-    with socket.create_connection((host, port)) as sock:
-        with context.wrap_socket(sock, server_hostname=host) as ssock:            
-            cert = ssock.getpeercert()
+    with socket.create_connection((host, port), timeout=5) as sock:
+        with get_tls_context().wrap_socket(sock, server_hostname=host) as ssock:
+            der = ssock.getpeercert(binary_form=True)
 
-            if cert:
+            if der:
+                cert = parse_certificate(der)
                 print(f'{ok_icon()} {host} SSL Certificate:')
-                for field, value in cert.items():
-                    print(f'{field}: {value}')
+                print(f'Subject: {cert["subject"]}')
+                print(f'Issuer: {cert["issuer"]}')
+                print(f'Validity: {cert["not_before"]:%Y-%m-%d} -> {cert["not_after"]:%Y-%m-%d} ({get_days_left(cert)} days left)')
+                if cert['san']: print(f'SAN: {", ".join(cert["san"])}')
+                print(f'SHA256: {cert["sha256"]}')
             else:
                 print(yellow('No SSL certificates returned'))
 
             print('HTTP header (if present):')
-            ssock.send(b'GET / HTTP/1.1\r\nHost: ' + host.encode() + b'\r\n\r\n')
-            response = ssock.recv(1024)
+            ssock.send(b'GET / HTTP/1.1\r\nHost: ' + host.encode() + b'\r\nConnection: close\r\n\r\n')
+            response = ssock.recv(4096)
             for line in response.decode(errors='ignore').split("\r\n"):
                 if line == '': continue
-                print(line)
\ No newline at end of file
+                print(line)
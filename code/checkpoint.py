@@ -0,0 +1,49 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import json, os
+
+
+class Scan_Checkpoint:
+    """
+    Stores the scan state as compact JSON. The file is written to a temporary
+    name and renamed, so an interruption never leaves a truncated state behind.
+    Each command versions its state format; files without a version are version 1.
+    """
+
+    def __init__(self, path:str, command:str, version:int=1) -> None:
+        self._path:str    = path
+        self._command:str = command
+        self._version:int = version
+
+
+    def _save(self, state:dict) -> None:
+        temporary = f'{self._path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({'command': self._command, 'version': self._version, **state}, file, separators=(',', ':'))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._path)
+
+
+    def _load(self) -> dict:
+        try:
+            with open(self._path) as file: state = json.load(file)
+        except FileNotFoundError:
+            raise ValueError(f'State file not found: {self._path}')
+        except json.JSONDecodeError:
+            raise ValueError(f'Invalid state file: {self._path}')
+        if state.get('command') != self._command:
+            raise ValueError(f'State file belongs to the "{state.get("command")}" command')
+        if state.get('version', 1) != self._version:
+            raise ValueError(f'State file format {state.get("version", 1)} is not supported by this version '
+                             f'(expected {self._version}); restart the scan without --resume')
+        return state
+
+
+    def _remove(self) -> None:
+        try:    os.remove(self._path)
+        except FileNotFoundError: pass
@@ -0,0 +1,219 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import json, os, re, socket, socketserver, stat, sys, threading, time, itertools
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from scapy.all          import conf
+from arg_parser         import Argument_Manager as ArgParser
+from pscan              import Port_Scanner
+from bgrab              import Banner_Grabbing
+from netmap             import Network_Mapper
+from tls_inventory      import TLS_Inventory, get_tls_context, enable_session_cache
+from service_detect     import get_signature_database
+from rate_limit         import set_rate_limit
+from display            import *
+
+
+class Scanner_Daemon:
+    """
+    Keeps scapy, the compiled service signatures and the TLS context loaded and
+    runs scan jobs received over a Unix socket. A request is one JSON line:
+        {"command": "pscan", "arguments": ["192.168.0.1", "-S"]}
+    The answer is streamed as JSON lines: {"job": 1, "output": "..."} for every
+    line printed by the job, then {"job": 1, "status": "done", "elapsed": 1.2}.
+    """
+
+    JOB_COMMANDS = {
+        'pscan':  Port_Scanner,
+        'banner': Banner_Grabbing,
+        'netmap': Network_Mapper,
+        'tls':    TLS_Inventory,
+    }
+
+    def __init__(self, parser_manager:ArgParser) -> None:
+        self._flags:dict                  = None
+        self._executor:ThreadPoolExecutor = None
+        self._server                      = None
+        self._job_ids                     = itertools.count(1)
+        self._get_argument_and_flags(parser_manager)
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._executor: self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._server:
+            self._server.server_close()
+            if os.path.exists(self._flags['socket']): os.remove(self._flags['socket'])
+        return False
+
+
+    def _get_argument_and_flags(self, parser_manager:ArgParser) -> None:
+        self._flags = {
+            'socket': parser_manager.socket or '/run/netxplorer.sock',
+            'jobs':   int(parser_manager.jobs) if parser_manager.jobs else 8,
+            'rate':   float(parser_manager.rate) if parser_manager.rate else None,
+        }
+
+
+    def _execute(self) -> None:
+        try:
+            self._warm_up()
+            self._start_server()
+            print(f'{green("Daemon listening")} on {self._flags["socket"]} '
+                  f'({self._flags["jobs"]} concurrent jobs, rate {self._flags["rate"] or "unlimited"} pps)')
+            self._server.serve_forever()
+        except KeyboardInterrupt:   print(f'\n{red("Daemon stopped")}')
+        except OSError as error:    print(f'{yellow("Socket error")}: {error}')
+        except Exception as error:  print(unexpected_error(error))
+
+
+    def _warm_up(self) -> None:
+        conf.verb = 0
+        get_signature_database()._preload()
+        get_tls_context()
+        enable_session_cache()
+        set_rate_limit(self._flags['rate'])
+        sys.stdout = Thread_Output(sys.stdout)
+
+
+    def _start_server(self) -> None:
+        self._remove_stale_socket()
+        self._executor = ThreadPoolExecutor(max_workers=self._flags['jobs'])
+        self._server   = Job_Server(self._flags['socket'], Job_Handler, self)
+        os.chmod(self._flags['socket'], 0o600)
+
+
+    def _remove_stale_socket(self) -> None:
+        path = self._flags['socket']
+        if not os.path.lexists(path): return
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise OSError(f'{path} exists and is not a socket')
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:    probe.connect(path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(path)
+                return
+        raise OSError(f'Another daemon is already listening on {path}')
+
+
+    # JOBS -------------------------------------------------------------------------------------------------------
+
+    def _submit(self, request:dict, writer) -> Future|None:
+        job_id  = next(self._job_ids)
+        if not isinstance(request, dict) or not isinstance(request.get('arguments', list()), list):
+            return writer({'job': job_id, 'status': 'error', 'error': 'A request must be an object with a list of arguments'})
+        command = request.get('command')
+        if command not in self.JOB_COMMANDS:
+            return writer({'job': job_id, 'status': 'error', 'error': f'Unknown command "{command}"'})
+        writer({'job': job_id, 'status': 'queued'})
+        return self._executor.submit(self._run_job, job_id, command, request.get('arguments', list()), writer)
+
+
+    def _run_job(self, job_id:int, command:str, arguments:list, writer) -> None:
+        start = time.perf_counter()
+        sys.stdout._register(lambda line: writer({'job': job_id, 'output': line}))
+        try:
+            arg_parser = ArgParser()._parse(command, [str(argument) for argument in arguments])
+            with self.JOB_COMMANDS[command](arg_parser) as strategy:
+                strategy._execute()
+            writer({'job': job_id, 'status': 'done', 'elapsed': round(time.perf_counter() - start, 3)})
+        except SystemExit:
+            writer({'job': job_id, 'status': 'error', 'error': 'Invalid arguments'})
+        except Exception as error:
+            writer({'job': job_id, 'status': 'error', 'error': str(error)})
+        finally:
+            sys.stdout._unregister()
+
+
+
+class Job_Server(socketserver.ThreadingUnixStreamServer):
+
+    daemon_threads = True
+
+    def __init__(self, path:str, handler, daemon:Scanner_Daemon) -> None:
+        self._daemon:Scanner_Daemon = daemon
+        super().__init__(path, handler)
+
+
+
+class Job_Handler(socketserver.StreamRequestHandler):
+    """
+    Requests of a connection are submitted as they arrive and run concurrently;
+    their output is interleaved and tagged with the job id. The connection is
+    kept open until the jobs it submitted are finished.
+    """
+
+    def handle(self) -> None:
+        lock    = threading.Lock()
+        pending = set()
+        broken  = threading.Event()
+
+        def writer(message:dict) -> None:
+            with lock:
+                if broken.is_set(): return
+                try:
+                    self.wfile.write(json.dumps(message).encode() + b'\n')
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    broken.set()
+
+        for line in self.rfile:
+            if broken.is_set(): break
+            if not line.strip(): continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                writer({'status': 'error', 'error': 'Invalid JSON request'})
+                continue
+            future = self.server._daemon._submit(request, writer)
+            if future:
+                pending.add(future)
+                future.add_done_callback(pending.discard)
+        wait(list(pending))
+
+
+
+class Thread_Output:
+    """
+    Replaces sys.stdout so that each job thread sends its printed lines to its own
+    client, while the other threads keep writing to the real stdout.
+    """
+
+    ANSI_CODES = re.compile(r'\033\[[0-9;]*m')
+
+    def __init__(self, stream) -> None:
+        self._stream = stream
+        self._local  = threading.local()
+
+
+    def _register(self, sink) -> None:
+        self._local.sink   = sink
+        self._local.buffer = ''
+
+
+    def _unregister(self) -> None:
+        if getattr(self._local, 'buffer', ''): self._local.sink(self.ANSI_CODES.sub('', self._local.buffer))
+        self._local.sink = None
+
+
+    def write(self, text:str) -> int:
+        sink = getattr(self._local, 'sink', None)
+        if sink is None: return self._stream.write(text)
+        lines              = (self._local.buffer + text).replace('\r', '\n').split('\n')
+        self._local.buffer = lines.pop()
+        for line in lines:
+            if line: sink(self.ANSI_CODES.sub('', line))
+        return len(text)
+
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+    def __getattr__(self, name:str):
+        return getattr(self._stream, name)
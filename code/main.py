@@ -5,11 +5,17 @@
 
 
 import sys
-from arg_parser import Argument_Manager as ArgParser
-from pscan      import Port_Scanner
-from bgrab      import Banner_Grabbing
-from netmap     import Network_Mapper
-from display    import *
+from arg_parser    import Argument_Manager as ArgParser
+from pscan         import Port_Scanner
+from bgrab         import Banner_Grabbing
+from netmap        import Network_Mapper
+from tls_inventory import TLS_Inventory
+from monitor       import Network_Monitor
+from passive       import Passive_Discovery
+from daemon        import Scanner_Daemon
+from stats         import Stats_Session
+from resolver      import set_nameserver
+from display       import *
 
 
 class Main:
@@ -17,10 +23,15 @@ class Main:
     def __init__(self) -> None:
         self._command:str    = None
         self._arguments:list = None
+        self._stats:dict     = {'stats': False, 'profile': None, 'live': None}
         self._commands_dict  = {
-            'pscan':  Port_Scanner,
-            'banner': Banner_Grabbing,
-            'netmap': Network_Mapper
+            'pscan':   Port_Scanner,
+            'banner':  Banner_Grabbing,
+            'netmap':  Network_Mapper,
+            'tls':     TLS_Inventory,
+            'monitor': Network_Monitor,
+            'passive': Passive_Discovery,
+            'daemon':  Scanner_Daemon,
         }
 
 
@@ -32,11 +43,43 @@ class Main:
     
     def _validate_input(self) -> None:
         try: 
-            self._command   = sys.argv[1]
-            self._arguments = sys.argv[2:] if len(sys.argv) > 2 else list()
+            arguments       = self._extract_global_options(sys.argv[1:])
+            self._command   = arguments[0]
+            self._arguments = arguments[1:]
             self._verify_if_the_command_exists()
         except IndexError:
             print(f'{yellow("Missing command name")}')
+        except ValueError as error:
+            print(f'{yellow("Error")}: {error}')
+
+
+    def _extract_global_options(self, arguments:list) -> list:
+        remaining = list()
+        arguments = iter(arguments)
+        for argument in arguments:
+            match argument:
+                case '--stats':      self._stats['stats']   = True
+                case '--profile':    self._stats['profile'] = self._get_option_value(argument, arguments)
+                case '--live-stats': self._stats['live']    = self._get_interval(argument, arguments)
+                case '--nameserver': set_nameserver(self._get_option_value(argument, arguments))
+                case _:              remaining.append(argument)
+        return remaining
+
+
+    def _get_option_value(self, option:str, arguments) -> str:
+        value = next(arguments, None)
+        if value is None or value in self._commands_dict or value.startswith('-'):
+            raise ValueError(f'{option} requires a value')
+        return value
+
+
+    def _get_interval(self, option:str, arguments) -> float:
+        value = self._get_option_value(option, arguments)
+        try:    interval = float(value)
+        except ValueError: interval = 0
+        if not 0 < interval < float('inf'):
+            raise ValueError(f'Invalid interval for {option}: "{value}" (expected seconds > 0)')
+        return interval
 
 
     def _verify_if_the_command_exists(self) -> None:
@@ -53,7 +96,7 @@ class Main:
     def _run_command(self, arg_parser:ArgParser) -> None:
         try:
             strategy_class = self._commands_dict.get(self._command)
-            with strategy_class(arg_parser) as strategy:
+            with Stats_Session(self._stats), strategy_class(arg_parser) as strategy:
                 strategy._execute()
         except Exception as error:
             print(f'{red("Error while trying to execute the command")}.\nERROR: {error}')
@@ -67,6 +110,15 @@ class Main:
               f'{green("pscan")}....: Portscaning\n'
               f'{green("banner")}...: Banner Grabbing\n'
               f'{green("netmap")}...: Network Mapping\n'
+              f'{green("tls")}......: TLS Certificate Inventory\n'
+              f'{green("monitor")}..: Continuous monitoring with change detection\n'
+              f'{green("passive")}..: Passive host discovery from sniffed traffic\n'
+              f'{green("daemon")}...: Run scan jobs received over a Unix socket\n'
+              'Global options:\n'
+              f'{green("--stats")}...........: Display stage timings and counters at the end\n'
+              f'{green("--profile FILE")}....: Save a cProfile dump and display the scapy/own time share\n'
+              f'{green("--live-stats SEC")}..: Print the counters periodically\n'
+              f'{green("--nameserver IP")}...: Send DNS queries to this server instead of the system resolver\n'
               )
 
 
@@ -0,0 +1,241 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import hashlib, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from datetime          import datetime
+from scapy.all         import conf, get_if_addr, Packet, AsyncSniffer
+from scapy.layers.l2   import Ether, ARP
+from scapy.layers.inet import IP, TCP
+from scapy.sendrecv    import srp, sr
+from arg_parser        import Argument_Manager as ArgParser
+from network           import *
+from service_detect    import grab_banner, get_banner_fingerprint
+from stats             import count, timed
+from rate_limit        import acquire, get_packet_interval
+from display           import *
+
+
+class Network_Monitor:
+    """
+    Keeps an in-memory model of the hosts and ports of the local network and only
+    reports changes. Hosts seen in passive ARP traffic are not probed again in the
+    same cycle, and the full ARP sweep only runs every few cycles. New hosts get all
+    their ports probed; known hosts share a fixed reprobe budget per cycle that
+    rotates across every (host, port) pair, so the traffic follows the rate of
+    change instead of the size of the network. Ports that do not answer keep their
+    last known state, so packet loss does not produce events. Banners are grabbed
+    for newly opened ports and, on full sweep cycles, for one known port per host.
+    """
+
+    def __init__(self, parser_manager:ArgParser) -> None:
+        self._flags:dict                = None
+        self._my_ip:str                 = get_if_addr(conf.iface)
+        self._network                   = get_ip_range(self._my_ip, get_subnet_mask(str(conf.iface)))
+        self._ports:list[int]           = None
+        self._hosts:dict[str, dict]     = dict()
+        self._new_hosts:set[str]        = set()
+        self._lock                      = threading.Lock()
+        self._sniffer:AsyncSniffer      = None
+        self._cycle:int                 = 0
+        self._reprobe_cursor:int        = 0
+        self._get_argument_and_flags(parser_manager)
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._sniffer and self._sniffer.running: self._sniffer.stop()
+        return False
+
+
+    def _execute(self) -> None:
+        try:
+            conf.verb = 0
+            self._start_passive_arp()
+            print(f'{green("Monitoring")} {self._network} every {self._flags["interval"]}s ({len(self._ports)} ports)')
+            self._monitor_loop()
+        except KeyboardInterrupt:   print(f'\n{red("Monitoring stopped")}')
+        except ValueError as error: print(f'{yellow("Error")}: {error}')
+        except Exception as error:  print(unexpected_error(error))
+
+
+    def _get_argument_and_flags(self, parser_manager:ArgParser) -> None:
+        self._flags = {
+            'interval': float(parser_manager.interval) if parser_manager.interval else 60.0,
+            'full':     int(parser_manager.full) if parser_manager.full else 10,
+            'reprobe':  int(parser_manager.reprobe) if parser_manager.reprobe else 64,
+            'misses':   int(parser_manager.misses) if parser_manager.misses else 2,
+            'banner':   parser_manager.banner,
+        }
+        self._ports = list(get_ports(parser_manager.port or 'common'))
+
+
+    def _monitor_loop(self) -> None:
+        while True:
+            started = time.monotonic()
+            with timed('monitor_cycle'):
+                self._run_cycle()
+            self._cycle += 1
+            time.sleep(max(0.0, self._flags['interval'] - (time.monotonic() - started)))
+
+
+    def _run_cycle(self) -> None:
+        alive = self._check_liveness()
+        self._update_liveness(alive)
+        with self._lock:
+            new_hosts = self._new_hosts & set(self._hosts)
+            self._new_hosts.clear()
+            known_hosts = sorted(ip for ip, host in self._hosts.items() if host['up'] and ip not in new_hosts)
+        targets = self._next_reprobe_targets(known_hosts)
+        targets.update({ip: self._ports for ip in new_hosts})
+        self._probe_ports(targets)
+
+
+    # PASSIVE ARP ------------------------------------------------------------------------------------------------
+
+    def _start_passive_arp(self) -> None:
+        self._sniffer = AsyncSniffer(iface=conf.iface, filter='arp', prn=self._handle_arp_packet, store=False)
+        self._sniffer.start()
+
+
+    def _handle_arp_packet(self, packet:Packet) -> None:
+        if ARP not in packet or packet[ARP].psrc in ('0.0.0.0', self._my_ip): return
+        count('passive_arp_packets')
+        self._host_seen(packet[ARP].psrc, packet[ARP].hwsrc, passive=True)
+
+
+    # LIVENESS ---------------------------------------------------------------------------------------------------
+
+    def _check_liveness(self) -> dict[str, str]:
+        if self._cycle % self._flags['full'] == 0:
+            targets = str(self._network)
+        else:
+            since   = time.monotonic() - self._flags['interval']
+            with self._lock:
+                targets = [ip for ip, host in self._hosts.items() if host['last_seen'] < since]
+        if not targets: return dict()
+        return self._arp_probe(targets)
+
+
+    def _arp_probe(self, targets:str|list[str]) -> dict[str, str]:
+        packet = Ether(dst="FF:FF:FF:FF:FF:FF") / ARP(op=1, pdst=targets)
+        acquire(self._network.num_addresses if isinstance(targets, str) else len(targets))
+        with timed('send_receive'):
+            responses, _ = srp(packet, inter=get_packet_interval(), timeout=2, verbose=False)
+        count('replies_matched', len(responses))
+        return {answered[ARP].psrc: answered[ARP].hwsrc for _, answered in responses}
+
+
+    def _update_liveness(self, alive:dict[str, str]) -> None:
+        for ip, mac in alive.items():
+            self._host_seen(ip, mac)
+        since = time.monotonic() - self._flags['interval']
+        with self._lock:
+            for ip, host in self._hosts.items():
+                if ip in alive or host['last_seen'] >= since or not host['up']: continue
+                host['misses'] += 1
+                if host['misses'] >= self._flags['misses']:
+                    host['up'] = False
+                    self._emit('HOST DOWN', ip, host['mac'])
+
+
+    def _host_seen(self, ip:str, mac:str, passive:bool=False) -> None:
+        with self._lock:
+            host = self._hosts.get(ip)
+            if host is None:
+                self._hosts[ip] = {'mac': mac, 'up': True, 'misses': 0, 'last_seen': time.monotonic(),
+                                   'ports': dict(), 'banners': dict(), 'banner_cursor': 0}
+                self._new_hosts.add(ip)
+                self._emit('HOST UP', ip, mac + (' (passive)' if passive else ''))
+                return
+            if host['mac'] != mac:
+                self._emit('MAC CHANGED', ip, f'{host["mac"]} -> {mac}')
+                host['mac'] = mac
+            if not host['up']:
+                host['up'] = True
+                self._new_hosts.add(ip)
+                self._emit('HOST UP', ip, mac)
+            host['misses']    = 0
+            host['last_seen'] = time.monotonic()
+
+
+    # PORTS ------------------------------------------------------------------------------------------------------
+
+    def _next_reprobe_targets(self, hosts:list[str]) -> dict[str, list[int]]:
+        """Consecutive pairs alternate between hosts, so the budget is spread across the network."""
+        total = len(hosts) * len(self._ports)
+        if not total: return dict()
+        targets = dict()
+        for index in range(self._reprobe_cursor, self._reprobe_cursor + min(self._flags['reprobe'], total)):
+            index %= total
+            targets.setdefault(hosts[index % len(hosts)], list()).append(self._ports[index // len(hosts)])
+        self._reprobe_cursor = (self._reprobe_cursor + min(self._flags['reprobe'], total)) % total
+        return targets
+
+
+    def _probe_ports(self, targets:dict[str, list[int]]) -> None:
+        packets = [IP(dst=ip) / TCP(dport=port, flags='S') for ip, ports in targets.items() for port in ports]
+        if not packets: return
+        acquire(len(packets))
+        with timed('send_receive'):
+            responses, _ = sr(packets, inter=get_packet_interval(), timeout=2, verbose=0)
+        count('packets_sent', len(packets))
+        count('replies_matched', len(responses))
+        states = {(sent[IP].dst, sent[TCP].dport): str(received[TCP].flags) == 'SA'
+                  for sent, received in responses if TCP in received}
+        opened = [(ip, port) for (ip, port), is_open in states.items() if self._update_port(ip, port, is_open)]
+        if self._flags['banner']: self._check_banners(opened + self._next_banner_ports(opened))
+
+
+    def _update_port(self, ip:str, port:int, is_open:bool) -> bool:
+        host      = self._hosts[ip]
+        was_open  = host['ports'].get(port, False)
+        host['ports'][port] = is_open
+        if is_open and not was_open: self._emit('PORT OPENED', ip, str(port))
+        if was_open and not is_open: self._emit('PORT CLOSED', ip, str(port))
+        return is_open and not was_open
+
+
+    # BANNERS ----------------------------------------------------------------------------------------------------
+
+    def _next_banner_ports(self, opened:list[tuple[str, int]]) -> list[tuple[str, int]]:
+        if self._cycle % self._flags['full'] != 0: return list()
+        targets = list()
+        with self._lock:
+            for ip, host in self._hosts.items():
+                known = sorted(port for port, is_open in host['ports'].items() if is_open)
+                if not host['up'] or not known: continue
+                host['banner_cursor'] = (host['banner_cursor'] + 1) % len(known)
+                port                  = known[host['banner_cursor']]
+                if (ip, port) not in opened: targets.append((ip, port))
+        return targets
+
+
+    def _check_banners(self, targets:list[tuple[str, int]]) -> None:
+        if not targets: return
+        with ThreadPoolExecutor(max_workers=min(32, len(targets))) as executor:
+            list(executor.map(lambda target: self._check_banner(*target), targets))
+
+
+    def _check_banner(self, ip:str, port:int) -> None:
+        banner = grab_banner(ip, port)
+        if not banner: return
+        digest   = hashlib.sha256(get_banner_fingerprint(port, banner)).hexdigest()
+        previous = self._hosts[ip]['banners'].get(port)
+        self._hosts[ip]['banners'][port] = digest
+        if previous and previous != digest:
+            self._emit('BANNER CHANGED', ip, f'{port} {banner[:60]!r}')
+
+
+    # EVENTS -----------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _emit(event:str, ip:str, detail:str) -> None:
+        color = green if event in ('HOST UP', 'PORT OPENED') else red if event in ('HOST DOWN', 'PORT CLOSED') else yellow
+        count('monitor_events')
+        print(f'{datetime.now():%Y-%m-%d %H:%M:%S} {color(event):<23} {ip:<15} {detail}')
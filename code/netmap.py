@@ -10,14 +10,22 @@ from scapy.layers.inet import IP, ICMP
 from scapy.sendrecv    import srp, sr
 from arg_parser        import Argument_Manager as ArgParser
 from network           import *
+from resolver          import reverse_lookups
+from stats             import count, timed
+from checkpoint        import Scan_Checkpoint
+from rate_limit        import acquire, get_packet_interval
+from pcap_reader       import *
 from display           import *
 
 
 class Network_Mapper:
 
     def __init__(self, parser_manager:ArgParser) -> None:
-        self._flags:dict = None
-        self._my_ip:str  = get_if_addr(conf.iface)
+        self._flags:dict                 = None
+        self._my_ip:str                  = get_if_addr(conf.iface)
+        self._position:int               = 0
+        self._active_hosts:list[str]     = list()
+        self._checkpoint:Scan_Checkpoint = None
         self._get_argument_and_flags(parser_manager)
 
 
@@ -30,20 +38,62 @@ class Network_Mapper:
 
     def _execute(self) -> None:
         try:
-            if self._flags['ping']: self._ping_sweep()
-            else:                   self._run_arp_methods()
-        except KeyboardInterrupt:   print(yellow("Process stopped"))
+            if   self._flags['pcap']: self._process_capture()
+            elif self._flags['ping']: self._ping_sweep()
+            else:                     self._run_arp_methods()
+            if self._checkpoint:    self._checkpoint._remove()
+        except KeyboardInterrupt:   print(yellow("Process stopped") + self._resume_hint())
         except ValueError as error: print(yellow(error))
         except Exception as error:  print(unexpected_error(error))
 
 
     def _get_argument_and_flags(self, parser_manager:ArgParser) -> None:
-        self._flags = {'ping': parser_manager.ping}
+        self._flags = {
+            'ping':  parser_manager.ping,
+            'names': parser_manager.names,
+            'pcap':  parser_manager.pcap,
+            'log':   parser_manager.probe_log,
+        }
+        self._prepare_checkpoint(parser_manager.checkpoint, parser_manager.resume)
+
+
+    # CHECKPOINT ----------------------------------------------------------------------
+
+    def _prepare_checkpoint(self, checkpoint_path:str|None, resume_path:str|None) -> None:
+        path = resume_path or checkpoint_path
+        if not path: return
+        self._checkpoint = Scan_Checkpoint(path, 'netmap')
+        if resume_path: self._restore_state(self._checkpoint._load())
+
+
+    def _restore_state(self, state:dict) -> None:
+        if state['network'] != str(self._get_ip_list()):
+            raise ValueError(f'The state file was created for {state["network"]}')
+        self._flags        = state['flags']
+        self._position     = state['position']
+        self._active_hosts = state['active_hosts']
+        print(f'Resuming ping sweep at address {self._position}')
+
+
+    def _save_state(self) -> None:
+        if not self._checkpoint: return
+        self._checkpoint._save({
+            'network':      str(self._get_ip_list()),
+            'flags':        self._flags,
+            'position':     self._position,
+            'active_hosts': self._active_hosts,
+        })
+
+
+    def _resume_hint(self) -> str:
+        if not self._checkpoint: return ''
+        return f'. Resume with: --resume {self._checkpoint._path}'
+
 
     # PACKETS -------------------------------------------------------------------------
 
-    def _get_arp_packet(self) -> Packet:
-        return Ether(dst="FF:FF:FF:FF:FF:FF") / ARP(op=1, pdst=self._my_ip)
+    def _get_arp_packet(self, network:ipaddress.IPv4Network) -> Packet:
+        return Ether(dst="FF:FF:FF:FF:FF:FF") / ARP(op=1, pdst=str(network))
     
     def _get_ping_packet(self, target_ip:ipaddress) -> Packet:
         return IP(dst=target_ip) / ICMP()
@@ -51,31 +101,48 @@ class Network_Mapper:
 
     # ARP -----------------------------------------------------------------------------
     def _run_arp_methods(self) -> None:
-        packet       = self._get_arp_packet()
-        responses, _ = srp(packet, timeout=2, verbose=False)
-        self._display_arp_result(responses)
+        network      = self._get_ip_list()
+        packet       = self._get_arp_packet(network)
+        acquire(network.num_addresses)
+        if self._flags['log']: append_probe_log(self._flags['log'], [(str(ip), 0) for ip in network])
+        with timed('send_receive'):
+            responses, _ = srp(packet, inter=get_packet_interval(), timeout=2, verbose=False)
+        count('packets_sent', network.num_addresses)
+        count('replies_matched', len(responses))
+        with timed('output'):
+            self._display_arp_result([(answered.psrc, answered.hwsrc) for _, answered in responses])
 
 
-    @staticmethod
-    def _display_arp_result(responses:list[Packet]) -> None:
-        for _, answered in responses:
-            print(f'{green("Active host")}: IP {answered.psrc:<15}, MAC {answered.hwsrc}')
+    def _display_arp_result(self, hosts:list[tuple[str, str|None]]) -> None:
+        names = self._get_hostnames([ip for ip, _ in hosts])
+        for ip, mac in hosts:
+            print(f'{green("Active host")}: IP {ip:<15}, MAC {mac or "-"}{names.get(ip, "")}')
 
 
     # PING ---------------------------------------------------------------------------
 
     def _ping_sweep(self) -> None:
-        packets   = self._create_packets()
-        responses = list() 
+        packets = self._create_packets()
         for pkt_sublist in packets:
-            received, _ = sr(pkt_sublist, timeout=5, verbose=0)
-            responses.append(received[-1])
+            acquire(len(pkt_sublist))
+            if self._flags['log']: append_probe_log(self._flags['log'], [(pkt[IP].dst, 0) for pkt in pkt_sublist])
+            with timed('send_receive'):
+                received, _ = sr(pkt_sublist, inter=get_packet_interval(), timeout=5, verbose=0, chainCC=True)
+            count('packets_sent', len(pkt_sublist))
+            count('replies_matched', len(received))
+            self._active_hosts.extend(answered.src for _, answered in received)
+            self._position += len(pkt_sublist)
+            self._save_state()
         print('ok')
-        self._display_ping_result(responses)
+        with timed('output'):
+            self._display_ping_result(self._active_hosts)
 
 
     def _create_packets(self) -> list[list[Packet]]:
-        packet_list = [self._get_ping_packet(str(ip)) for ip in self._get_ip_list()]
+        with timed('packet_build'):
+            ip_list     = list(self._get_ip_list())[self._position:]
+            packet_list = [self._get_ping_packet(str(ip)) for ip in ip_list]
+        count('packets_built', len(packet_list))
         return self._calculate_max_packets(packet_list)
 
 
@@ -94,8 +161,48 @@ class Network_Mapper:
         return packet_sublists
 
 
-    @staticmethod
-    def _display_ping_result(active_hosts:list) -> None:
+    def _display_ping_result(self, active_hosts:list) -> None:
         print('\n')
+        names = self._get_hostnames([str(ip) for ip in active_hosts])
         for ip in active_hosts:
-            print(f'{green("Active host")}: {ip}')
\ No newline at end of file
+            print(f'{green("Active host")}: {ip}{names.get(str(ip), "")}')
+
+
+    # CAPTURE FILE ------------------------------------------------------------------
+
+    def _process_capture(self) -> None:
+        probed = {ip for ip, _ in read_probe_log(self._flags['log'])} if self._flags['log'] else None
+        with timed('capture_processing'):
+            hosts = self._match_capture_replies(probed)
+        with timed('output'):
+            self._display_arp_result(list(hosts.items()))
+
+
+    def _match_capture_replies(self, probed:set[str]|None) -> dict[str, str|None]:
+        hosts    = dict()
+        received = 0
+        for linktype, frame in read_capture(self._flags['pcap']):
+            header = get_network_offset(linktype, frame)
+            if header is None: continue
+            ethertype, offset = header
+            if ethertype == 0x0806 and len(frame) >= offset + 28 and frame[offset + 7] == 2:
+                ip, mac = socket.inet_ntoa(frame[offset + 14:offset + 18]), bytes(frame[offset + 8:offset + 14]).hex(':')
+            elif ethertype == 0x0800 and len(frame) >= offset + 20 and frame[offset + 9] == 1:
+                icmp = offset + (frame[offset] & 0x0f) * 4
+                if len(frame) <= icmp or frame[icmp] != 0: continue
+                ip, mac = socket.inet_ntoa(frame[offset + 12:offset + 16]), None
+            else:
+                continue
+            received += 1
+            if probed is None or ip in probed:
+                hosts[ip] = mac or hosts.get(ip)
+        count('replies_received', received)
+        count('replies_matched', len(hosts))
+        return hosts
+
+
+    # HOSTNAMES ----------------------------------------------------------------------
+
+    def _get_hostnames(self, ips:list[str]) -> dict[str, str]:
+        if not self._flags['names']: return dict()
+        return {ip: f', Name {name}' for ip, name in reverse_lookups(ips).items() if name}
\ No newline at end of file
@@ -0,0 +1,281 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import socket, struct, time, ctypes
+from collections import OrderedDict
+from arg_parser  import Argument_Manager as ArgParser
+from network     import get_default_iface
+from pcap_reader import read_capture, get_network_offset, LINKTYPE_ETHERNET
+from resolver    import read_dns_name
+from stats       import count
+from display     import *
+
+
+ETH_P_ALL        = 0x0003
+SO_ATTACH_FILTER = getattr(socket, 'SO_ATTACH_FILTER', 26)
+MDNS_PORT        = 5353
+DHCP_PORTS       = (67, 68)
+
+
+class Passive_Discovery:
+    """
+    Builds a host table from sniffed traffic only: ARP, DHCP, mDNS and TCP SYN-ACKs
+    (listening services). A BPF filter attached to the AF_PACKET socket lets only
+    those frames reach Python, and frames are parsed straight from a reused buffer.
+    """
+
+    def __init__(self, parser_manager:ArgParser) -> None:
+        self._flags:dict  = None
+        self._hosts       = Host_Table()
+        self._get_argument_and_flags(parser_manager)
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+    def _execute(self) -> None:
+        try:
+            if self._flags['read']: self._replay_pcap()
+            else:                   self._sniff()
+        except KeyboardInterrupt:   print(f'\n{red("Process stopped")}')
+        except PermissionError:     print(f'{yellow("Error")}: root privileges are required to sniff')
+        except ValueError as error: print(f'{yellow("Error")}: {error}')
+        except Exception as error:  print(unexpected_error(error))
+        self._display_hosts()
+
+
+    def _get_argument_and_flags(self, parser_manager:ArgParser) -> None:
+        self._flags = {
+            'iface':   parser_manager.iface or get_default_iface(),
+            'read':    parser_manager.read,
+            'timeout': float(parser_manager.timeout) if parser_manager.timeout else None,
+        }
+        if parser_manager.max: self._hosts = Host_Table(int(parser_manager.max))
+
+
+    # CAPTURE ----------------------------------------------------------------------------------------------------
+
+    def _sniff(self) -> None:
+        with socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL)) as sock:
+            program = build_filter()
+            buffer  = ctypes.create_string_buffer(program, len(program))
+            sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER,
+                            struct.pack('HL', len(program) // 8, ctypes.addressof(buffer)))
+            sock.bind((self._flags['iface'], 0))
+            print(f'{green("Listening")} on {self._flags["iface"]} (Ctrl-C to stop)')
+            self._receive_loop(sock)
+
+
+    def _receive_loop(self, sock:socket.socket) -> None:
+        buffer   = bytearray(65535)
+        view     = memoryview(buffer)
+        deadline = time.monotonic() + self._flags['timeout'] if self._flags['timeout'] else None
+        sock.settimeout(1.0)
+        while deadline is None or time.monotonic() < deadline:
+            try:    size = sock.recv_into(buffer)
+            except socket.timeout: continue
+            parse_frame(view[:size], self._hosts)
+
+
+    def _replay_pcap(self) -> None:
+        start  = time.perf_counter()
+        frames = 0
+        for linktype, frame in read_capture(self._flags['read']):
+            parse_frame(frame, self._hosts, linktype)
+            frames += 1
+        elapsed = time.perf_counter() - start
+        print(f'{frames} frames processed in {elapsed:.3f}s ({frames / elapsed if elapsed else 0:.0f} frames/s)')
+
+
+    def _display_hosts(self) -> None:
+        print(f'\n{green("Discovered hosts")}: {len(self._hosts)}')
+        for ip, host in self._hosts._items():
+            names = f', Name {", ".join(sorted(host["names"]))}' if host['names'] else ''
+            ports = f', Ports {", ".join(map(str, sorted(host["ports"])))}' if host['ports'] else ''
+            print(f'IP {ip:<15} MAC {host["mac"] or "-":<17} via {",".join(sorted(host["sources"]))}{names}{ports}')
+
+
+
+class Host_Table:
+    """
+    Deduplicated by IP and bounded: the least recently seen host is evicted first,
+    and each host keeps at most max_names names and max_ports ports.
+    """
+
+    def __init__(self, max_size:int=4096, max_names:int=32, max_ports:int=256) -> None:
+        self._max_size:int       = max_size
+        self._max_names:int      = max_names
+        self._max_ports:int      = max_ports
+        self._hosts:OrderedDict  = OrderedDict()
+
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+
+    def _items(self) -> list:
+        return list(self._hosts.items())
+
+
+    def _update(self, ip:str, source:str, mac:str=None, name:str=None, port:int=None) -> None:
+        host = self._hosts.get(ip)
+        if host is None:
+            host = {'mac': None, 'names': set(), 'ports': set(), 'sources': set()}
+            self._hosts[ip] = host
+            count('passive_hosts')
+            if len(self._hosts) > self._max_size:
+                self._hosts.popitem(last=False)
+                count('passive_evictions')
+        else:
+            self._hosts.move_to_end(ip)
+        host['sources'].add(source)
+        if mac:              host['mac'] = mac
+        if name:             self._add_limited(host['names'], name, self._max_names)
+        if port is not None: self._add_limited(host['ports'], port, self._max_ports)
+
+
+    @staticmethod
+    def _add_limited(values:set, value, limit:int) -> None:
+        if value in values: return
+        if len(values) >= limit:
+            count('passive_items_dropped')
+            return
+        values.add(value)
+
+
+
+# FRAME PARSER ===============================================================================================
+
+def parse_frame(frame:memoryview, hosts:Host_Table, linktype:int=LINKTYPE_ETHERNET) -> None:
+    header = get_network_offset(linktype, frame)
+    if header is None: return
+    ethertype, offset = header
+    if   ethertype == 0x0806: parse_arp(frame, offset, hosts)
+    elif ethertype == 0x0800: parse_ipv4(frame, offset, hosts)
+
+
+def parse_arp(frame:memoryview, offset:int, hosts:Host_Table) -> None:
+    if len(frame) < offset + 28: return
+    sender_ip = socket.inet_ntoa(frame[offset + 14:offset + 18])
+    if sender_ip == '0.0.0.0': return
+    hosts._update(sender_ip, 'arp', mac=format_mac(frame[offset + 8:offset + 14]))
+
+
+def parse_ipv4(frame:memoryview, offset:int, hosts:Host_Table) -> None:
+    if len(frame) < offset + 20 or frame[offset + 6] & 0x1f or frame[offset + 7]: return
+    header_size = (frame[offset] & 0x0f) * 4
+    protocol    = frame[offset + 9]
+    source      = socket.inet_ntoa(frame[offset + 12:offset + 16])
+    payload     = offset + header_size
+    if len(frame) < payload + 8: return
+
+    if protocol == 6:
+        if len(frame) >= payload + 14 and frame[payload + 13] & 0x12 == 0x12:
+            hosts._update(source, 'tcp', port=frame[payload] << 8 | frame[payload + 1])
+    elif protocol == 17:
+        source_port = frame[payload] << 8 | frame[payload + 1]
+        dest_port   = frame[payload + 2] << 8 | frame[payload + 3]
+        if   MDNS_PORT in (source_port, dest_port):                 parse_mdns(frame[payload + 8:], source, hosts)
+        elif source_port in DHCP_PORTS and dest_port in DHCP_PORTS: parse_dhcp(frame[payload + 8:], hosts)
+
+
+def parse_dhcp(data:memoryview, hosts:Host_Table) -> None:
+    if len(data) < 240 or bytes(data[236:240]) != b'\x63\x82\x53\x63': return
+    mac     = format_mac(data[28:34])
+    address = bytes(data[16:20]) if any(data[16:20]) else bytes(data[12:16])
+    name    = None
+    for code, value in iterate_dhcp_options(data):
+        if   code == 12: name = bytes(value).decode('utf-8', errors='replace')
+        elif code == 50 and len(value) >= 4 and not any(address): address = bytes(value[:4])
+    if any(address): hosts._update(socket.inet_ntoa(address), 'dhcp', mac=mac, name=name)
+
+
+def iterate_dhcp_options(data:memoryview):
+    index = 240
+    while index < len(data):
+        code = data[index]
+        if code == 255: return
+        if code == 0:
+            index += 1
+            continue
+        if index + 1 >= len(data): return
+        length = data[index + 1]
+        yield code, data[index + 2:index + 2 + length]
+        index += 2 + length
+
+
+def parse_mdns(data:memoryview, source:str, hosts:Host_Table) -> None:
+    if len(data) < 12 or not data[2] & 0x80: return
+    questions, answers, authority, additional = struct.unpack_from('!HHHH', data, 4)
+    offset = 12
+    try:
+        for _ in range(questions):
+            _, offset = read_dns_name(data, offset)
+            offset += 4
+        for _ in range(answers + authority + additional):
+            name, offset = read_dns_name(data, offset)
+            record_type, _, _, length = struct.unpack_from('!HHIH', data, offset)
+            offset += 10
+            if offset + length > len(data): raise ValueError('Truncated mDNS record')
+            if   record_type == 1 and length == 4:   hosts._update(socket.inet_ntoa(data[offset:offset + 4]), 'mdns', name=name)
+            elif record_type == 33 and length >= 6:  hosts._update(source, 'mdns', port=data[offset + 4] << 8 | data[offset + 5])
+            offset += length
+    except (struct.error, IndexError, ValueError, OSError):
+        count('passive_malformed')
+
+
+def format_mac(raw:memoryview) -> str:
+    return bytes(raw).hex(':')
+
+
+
+# BPF FILTER =================================================================================================
+
+def build_filter() -> bytes:
+    """
+    arp or (udp port 67/68/5353) or (tcp with SYN and ACK set), unfragmented IPv4 only.
+    Returns the assembled instructions (8 bytes each); the kernel copies them on attach.
+    """
+    program = [
+        (0x28, 0, 0, 12),                        # ldh [12]              ethertype
+        (0x15, 'accept', 0, 0x0806),             # jeq ARP
+        (0x15, 0, 'reject', 0x0800),             # jeq IPv4
+        (0x28, 0, 0, 20),                        # ldh [20]              flags/fragment offset
+        (0x45, 'reject', 0, 0x1fff),             # jset fragment offset
+        (0xb1, 0, 0, 14),                        # ldxb 4*([14]&0xf)     IP header size
+        (0x30, 0, 0, 23),                        # ldb [23]              protocol
+        (0x15, 0, 'udp', 6),                     # jeq TCP
+        (0x50, 0, 0, 27),                        # ldb [x+27]            TCP flags
+        (0x54, 0, 0, 0x12),                      # and SYN|ACK
+        (0x15, 'accept', 'reject', 0x12),
+        ('udp', 0x15, 0, 'reject', 17),          # jeq UDP
+        (0x48, 0, 0, 14),                        # ldh [x+14]            source port
+        (0x15, 'accept', 0, 67),
+        (0x15, 'accept', 0, 68),
+        (0x15, 'accept', 0, MDNS_PORT),
+        (0x48, 0, 0, 16),                        # ldh [x+16]            destination port
+        (0x15, 'accept', 0, 67),
+        (0x15, 'accept', 0, 68),
+        (0x15, 'accept', 'reject', MDNS_PORT),
+        ('reject', 0x06, 0, 0, 0),               # ret 0
+        ('accept', 0x06, 0, 0, 0x40000),         # ret 256KB
+    ]
+    return assemble_filter(program)
+
+
+def assemble_filter(program:list[tuple]) -> bytes:
+    labels = {line[0]: index for index, line in enumerate(program) if isinstance(line[0], str)}
+    code   = b''
+    for index, line in enumerate(program):
+        opcode, true_jump, false_jump, value = line[1:] if isinstance(line[0], str) else line
+        true_jump  = labels[true_jump] - index - 1 if isinstance(true_jump, str) else true_jump
+        false_jump = labels[false_jump] - index - 1 if isinstance(false_jump, str) else false_jump
+        code      += struct.pack('HBBI', opcode, true_jump, false_jump, value)
+    return code
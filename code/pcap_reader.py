@@ -0,0 +1,110 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import mmap, struct
+
+
+LINKTYPE_ETHERNET = 1
+PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': '<', b'\x4d\x3c\xb2\xa1': '<',
+    b'\xa1\xb2\xc3\xd4': '>', b'\xa1\xb2\x3c\x4d': '>',
+}
+PCAPNG_SECTION   = 0x0a0d0d0a
+PCAPNG_INTERFACE = 0x00000001
+PCAPNG_SIMPLE    = 0x00000003
+PCAPNG_ENHANCED  = 0x00000006
+
+
+def read_capture(path:str):
+    """
+    Yields (linktype, frame) for every record of a pcap or pcapng file. The file is
+    mapped in memory and each frame is a memoryview into the map, so nothing is
+    copied and memory use does not grow with the size of the capture. The map is
+    released when the last frame view is dropped.
+    """
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    data = memoryview(mapped)
+    if   bytes(data[:4]) in PCAP_MAGIC:                               yield from iterate_pcap(data)
+    elif len(data) >= 4 and struct.unpack_from('<I', data)[0] == PCAPNG_SECTION: yield from iterate_pcapng(data)
+    else: raise ValueError('Unsupported capture format (expected pcap or pcapng)')
+
+
+def iterate_pcap(data:memoryview):
+    if len(data) < 24: return
+    endian    = PCAP_MAGIC[bytes(data[:4])]
+    linktype  = struct.unpack_from(endian + 'I', data, 20)[0] & 0x0fffffff
+    record    = struct.Struct(endian + 'IIII')
+    offset    = 24
+    end       = len(data)
+    while offset + 16 <= end:
+        _, _, captured, _ = record.unpack_from(data, offset)
+        offset += 16
+        if offset + captured > end: return
+        yield linktype, data[offset:offset + captured]
+        offset += captured
+
+
+def iterate_pcapng(data:memoryview):
+    endian     = '<'
+    linktypes  = list()
+    offset     = 0
+    end        = len(data)
+    while offset + 12 <= end:
+        block_type = struct.unpack_from(endian + 'I', data, offset)[0]
+        if block_type == PCAPNG_SECTION:
+            endian    = '<' if bytes(data[offset + 8:offset + 12]) == b'\x4d\x3c\x2b\x1a' else '>'
+            linktypes = list()
+        block_size = struct.unpack_from(endian + 'I', data, offset + 4)[0]
+        if block_size < 12 or offset + block_size > end: return
+
+        if block_type == PCAPNG_INTERFACE and block_size >= 20:
+            linktypes.append(struct.unpack_from(endian + 'H', data, offset + 8)[0])
+        elif block_type == PCAPNG_ENHANCED and block_size >= 32:
+            interface, _, _, captured = struct.unpack_from(endian + 'IIII', data, offset + 8)
+            if interface < len(linktypes) and 32 + captured <= block_size:
+                yield linktypes[interface], data[offset + 28:offset + 28 + captured]
+        elif block_type == PCAPNG_SIMPLE and block_size >= 16 and linktypes:
+            original = struct.unpack_from(endian + 'I', data, offset + 8)[0]
+            yield linktypes[0], data[offset + 12:offset + 12 + min(original, block_size - 16)]
+        offset += block_size
+
+
+def get_network_offset(linktype:int, frame:memoryview) -> tuple[int, int]|None:
+    """Returns (ethertype, offset of the network header) or None for other link types."""
+    match linktype:
+        case 1:
+            if len(frame) < 14: return None
+            ethertype, offset = frame[12] << 8 | frame[13], 14
+            if ethertype == 0x8100 and len(frame) >= 18:
+                ethertype, offset = frame[16] << 8 | frame[17], 18
+            return ethertype, offset
+        case 113:
+            if len(frame) < 16: return None
+            return frame[14] << 8 | frame[15], 16
+        case 101 | 228:
+            return (0x0800, 0) if frame and frame[0] >> 4 == 4 else None
+        case _:
+            return None
+
+
+def format_tcp_flags(flags:int) -> str:
+    """Same letters and order as scapy's FlagValue (e.g. 'SA', 'RA')."""
+    return ''.join(letter for bit, letter in enumerate('FSRPAUEC') if flags >> bit & 1)
+
+
+
+# PROBE LOG ==================================================================================================
+
+def append_probe_log(path:str, probes:list[tuple[str, int]]) -> None:
+    """One probe per line: '<destination ip> <destination port>' (port 0 for ARP/ICMP)."""
+    with open(path, 'a') as file:
+        file.writelines(f'{ip} {port}\n' for ip, port in probes)
+
+
+def read_probe_log(path:str) -> list[tuple[str, int]]:
+    with open(path) as file:
+        return [(ip, int(port)) for ip, port in (line.split() for line in file if line.strip())]
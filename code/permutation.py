@@ -0,0 +1,123 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import math, random
+
+
+class Cyclic_Permutation:
+    """
+    Visits every index in [0, size) once, in a pseudo-random order, using the
+    multiplicative group of integers modulo a prime p > size (as ZMap does).
+    The seed chooses a primitive root g and a starting element; step k yields
+    start * g^k mod p, and values above size are skipped. Shard i of n takes the
+    steps k = i, i+n, i+2n... so shards are disjoint and together cover everything.
+    Memory use is constant.
+    """
+
+    def __init__(self, size:int, seed:int, shard:int=0, shards:int=1) -> None:
+        if shards < 1 or not 0 <= shard < shards:
+            raise ValueError(f'Invalid shard {shard}/{shards}')
+        self._size:int      = size
+        self._prime:int     = next_prime(size + 1)
+        self._generator:int = None
+        self._start:int     = None
+        self._step:int      = None
+        self._steps:int     = max(0, -(-(self._prime - 1 - shard) // shards))
+        self._setup(seed, shard, shards)
+
+
+    def __iter__(self):
+        return self._iterate()
+
+
+    def _setup(self, seed:int, shard:int, shards:int) -> None:
+        rng             = random.Random(seed)
+        self._generator = find_primitive_root(self._prime, rng)
+        first           = rng.randrange(1, self._prime) if self._prime > 2 else 1
+        self._start     = first * pow(self._generator, shard, self._prime) % self._prime
+        self._step      = pow(self._generator, shards, self._prime)
+
+
+    def _iterate(self):
+        value = self._start
+        for _ in range(self._steps):
+            if value <= self._size: yield value - 1
+            value = value * self._step % self._prime
+
+
+
+# NUMBER THEORY ==============================================================================================
+
+def is_prime(number:int) -> bool:
+    if number < 2: return False
+    for prime in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if number % prime == 0: return number == prime
+    odd, exponent = number - 1, 0
+    while odd % 2 == 0:
+        odd      //= 2
+        exponent += 1
+    for base in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        value = pow(base, odd, number)
+        if value in (1, number - 1): continue
+        for _ in range(exponent - 1):
+            value = value * value % number
+            if value == number - 1: break
+        else:
+            return False
+    return True
+
+
+def next_prime(number:int) -> int:
+    while not is_prime(number): number += 1
+    return number
+
+
+def prime_factors(number:int) -> set[int]:
+    factors = set()
+    for prime in (2, 3, 5, 7, 11, 13):
+        while number % prime == 0:
+            factors.add(prime)
+            number //= prime
+    pending = [number] if number > 1 else []
+    while pending:
+        value = pending.pop()
+        if is_prime(value):
+            factors.add(value)
+            continue
+        divisor = pollard_rho(value)
+        pending.extend((divisor, value // divisor))
+    return factors
+
+
+def pollard_rho(number:int) -> int:
+    constant = 1
+    while True:
+        x = y = 2
+        divisor = 1
+        while divisor == 1:
+            x       = (x * x + constant) % number
+            y       = (y * y + constant) % number
+            y       = (y * y + constant) % number
+            divisor = math.gcd(abs(x - y), number)
+        if divisor != number: return divisor
+        constant += 1
+
+
+def find_primitive_root(prime:int, rng:random.Random) -> int:
+    if prime == 2: return 1
+    factors = prime_factors(prime - 1)
+    while True:
+        candidate = rng.randrange(2, prime)
+        if all(pow(candidate, (prime - 1) // factor, prime) != 1 for factor in factors):
+            return candidate
+
+
+def parse_shard(value:str) -> tuple[int, int]:
+    try:
+        shard, shards = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f'Invalid shard "{value}" (expected i/n, e.g. 0/4)')
+    return shard, shards
@@ -11,16 +11,28 @@ from arg_parser        import Argument_Manager as ArgParser
 from pscan_normal      import Normal_Scan
 from pscan_decoy       import Decoy
 from network           import get_ports
+from resolver          import resolve_hostname, reverse_lookup
+from service_detect    import detect_services
+from stats             import count, timed
+from checkpoint        import Scan_Checkpoint
+from permutation       import Cyclic_Permutation, parse_shard
+from pcap_reader       import *
 from display           import *
 
 
+CHECKPOINT_BATCH   = 256
+CHECKPOINT_VERSION = 2
+
+
 class Port_Scanner:
 
     def __init__(self, parser_manager:ArgParser) -> None:
-        self._target_ip:str    = None
-        self._flags:dict       = None
-        self._ports:dict       = None
-        self._responses:Packet = None
+        self._target_ip:str               = None
+        self._flags:dict                  = None
+        self._ports:dict                  = None
+        self._results:list                = list()
+        self._position:int                = 0
+        self._checkpoint:Scan_Checkpoint  = None
         self._get_argument_and_flags(parser_manager)
 
 
@@ -34,61 +46,192 @@ class Port_Scanner:
     def _execute(self) -> None:
         try:
             conf.verb = 0
+            self._display_target()
             self._get_result_by_transmission_method()
             self._process_responses()
-        except KeyboardInterrupt:   print(f'\n{red("Process stopped")}')
+            if self._checkpoint: self._checkpoint._remove()
+        except KeyboardInterrupt:   print(f'\n{red("Process stopped")}{self._resume_hint()}')
         except ValueError as error: print(f'{yellow("Error")}: {error}')
         except Exception as error:  print(unexpected_error(error))
 
 
     def _get_argument_and_flags(self, parser_manager:ArgParser) -> None:
-        self._target_ip  = socket.gethostbyname(parser_manager.host)
+        self._target_ip  = resolve_hostname(parser_manager.host)
         self._flags = {
             'show':    parser_manager.show,
             'port':    parser_manager.port,
             'all':     parser_manager.all,
             'random':  parser_manager.random,
+            'seed':    int(parser_manager.seed) if parser_manager.seed else None,
+            'shard':   parse_shard(parser_manager.shard) if parser_manager.shard else None,
             'delay':   parser_manager.delay,
             'stealth': parser_manager.stealth,
             'decoy':   parser_manager.decoy,
+            'names':   parser_manager.names,
+            'version': parser_manager.version,
+            'pcap':    parser_manager.pcap,
+            'log':     parser_manager.probe_log,
         }
+        self._prepare_checkpoint(parser_manager.checkpoint, parser_manager.resume)
+
+
+    # CHECKPOINT ---------------------------------------------------------------------------------------------
+
+    def _prepare_checkpoint(self, checkpoint_path:str|None, resume_path:str|None) -> None:
+        path = resume_path or checkpoint_path
+        if not path: return
+        self._checkpoint = Scan_Checkpoint(path, 'pscan', CHECKPOINT_VERSION)
+        if resume_path: self._restore_state(self._checkpoint._load())
+
+
+    def _restore_state(self, state:dict) -> None:
+        if state['target'] != self._target_ip:
+            raise ValueError(f'The state file was created for {state["target"]}')
+        self._flags    = state['flags']
+        self._position = state['position']
+        self._prepare_ports()
+        self._results  = [tuple(result) for result in state['results']]
+        print(f'Resuming scan at port {self._position}/{len(self._ports)}')
+
+
+    def _save_state(self) -> None:
+        self._checkpoint._save({
+            'target':   self._target_ip,
+            'flags':    self._flags,
+            'position': self._position,
+            'results':  self._results,
+        })
+
+
+    def _resume_hint(self) -> str:
+        if not self._checkpoint: return ''
+        return f'. Resume with: --resume {self._checkpoint._path}'
+
+
+    def _display_target(self) -> None:
+        if not self._flags['names']: return
+        hostname = reverse_lookup(self._target_ip) or 'No PTR record'
+        print(f'Target: {self._target_ip} ({hostname})')
 
 
     def _get_result_by_transmission_method(self) -> list:
-        if self._flags['decoy']: self._perform_decoy_scan()
-        else:                    self._perform_normal_scan()
+        if   self._flags['pcap']:  self._process_capture()
+        elif self._flags['decoy']: self._perform_decoy_scan()
+        else:                      self._perform_normal_scan()
 
     
     def _perform_normal_scan(self) -> None:
         self._prepare_ports()
-        with Normal_Scan(self._target_ip, list(self._ports.keys()), self._flags) as SCAN:
-            self._responses = SCAN._perform_normal_methods()
+        if self._checkpoint: self._perform_checkpointed_scan()
+        else:                self._scan_ports(list(self._ports.keys()))
+
+
+    def _perform_checkpointed_scan(self) -> None:
+        ports = list(self._ports.keys())
+        while self._position < len(ports):
+            batch = ports[self._position:self._position + CHECKPOINT_BATCH]
+            self._scan_ports(batch)
+            self._position += len(batch)
+            self._save_state()
+
+
+    def _scan_ports(self, ports:list[int]) -> None:
+        if self._flags['log']: append_probe_log(self._flags['log'], [(self._target_ip, port) for port in ports])
+        with Normal_Scan(self._target_ip, ports, self._flags) as SCAN:
+            self._store_responses(SCAN._perform_normal_methods())
 
     
     def _perform_decoy_scan(self) -> None:
         self._prepare_ports()
         with Decoy(self._target_ip, list(self._ports.keys())) as DECOY:
-            self._responses     = DECOY._perform_decoy_methods()
+            self._store_responses(DECOY._perform_decoy_methods())
             self._flags['show'] = True
 
+
+    # CAPTURE FILE -------------------------------------------------------------------------------------------
+
+    def _process_capture(self) -> None:
+        ports = self._get_probed_ports()
+        with timed('capture_processing'):
+            replies = self._match_capture_replies(set(ports))
+        self._results = [(port, replies.get(port)) for port in ports]
+
+
+    def _get_probed_ports(self) -> list[int]:
+        if not self._flags['log']:
+            self._prepare_ports()
+            return list(self._ports)
+        probes      = read_probe_log(self._flags['log'])
+        ports       = list(dict.fromkeys(port for ip, port in probes if ip == self._target_ip))
+        self._ports = get_ports(','.join(map(str, ports))) if ports else dict()
+        return ports
+
+
+    def _match_capture_replies(self, ports:set[int]) -> dict[int, str]:
+        target   = socket.inet_aton(self._target_ip)
+        replies  = dict()
+        received = 0
+        for linktype, frame in read_capture(self._flags['pcap']):
+            header = get_network_offset(linktype, frame)
+            if header is None or header[0] != 0x0800: continue
+            offset = header[1]
+            if len(frame) < offset + 20 or frame[offset + 9] != 6 or frame[offset + 12:offset + 16] != target: continue
+            tcp = offset + (frame[offset] & 0x0f) * 4
+            if len(frame) < tcp + 14: continue
+            received += 1
+            port = frame[tcp] << 8 | frame[tcp + 1]
+            if port in ports and port not in replies: replies[port] = format_tcp_flags(frame[tcp + 13])
+        count('replies_received', received)
+        count('replies_matched', len(replies))
+        return replies
+
+
+    def _store_responses(self, responses:list[Packet]) -> None:
+        self._results.extend(self._get_port_and_flag(sent, received) for sent, received in responses)
+
     
     def _prepare_ports(self) -> None:
+        if self._ports is not None: return
         if   self._flags['decoy']: self._ports = get_ports(self._flags['decoy'])
         elif self._flags['port']:  self._ports = get_ports(self._flags['port'])
         elif self._flags['all']:   self._ports = get_ports()
         else:                      self._ports = get_ports('common')
 
-        if self._flags['random']:
-            random_list = random.sample(list(self._ports.items()), len(self._ports))
-            self._ports = dict(random_list)
+        if self._flags['random'] or self._flags['seed'] is not None or self._flags['shard']: self._permute_ports()
+
+
+    def _permute_ports(self) -> None:
+        if self._flags['seed'] is None:
+            if self._flags['shard']: raise ValueError('--shard requires --seed so every shard uses the same order')
+            self._flags['seed'] = random.SystemRandom().getrandbits(32)
+            print(f'Random order seed: {self._flags["seed"]}')
+        shard, shards = self._flags['shard'] or (0, 1)
+        ports         = list(self._ports.items())
+        permutation   = Cyclic_Permutation(len(ports), self._flags['seed'], shard, shards)
+        self._ports   = dict(ports[index] for index in permutation)
 
 
     def _process_responses(self) -> None:
-        for sent, received in self._responses:
-            port        = sent[TCP].dport if not isinstance(sent[TCP].dport, list) else sent[TCP].dport[0]
-            flag        = received[TCP].flags if received else None
-            description = self._ports[port]
-            self._display_result(flag, port, description)
+        services = self._detect_services([port for port, flag in self._results if flag == 'SA'])
+        with timed('output'):
+            for port, flag in self._results:
+                description = self._ports[port] + services.get(port, '')
+                self._display_result(flag, port, description)
+
+
+    @staticmethod
+    def _get_port_and_flag(sent:Packet, received:Packet|None) -> tuple[int, str|None]:
+        port = sent[TCP].dport if not isinstance(sent[TCP].dport, list) else sent[TCP].dport[0]
+        flag = str(received[TCP].flags) if received else None
+        return port, flag
+
+
+    def _detect_services(self, open_ports:list[int]) -> dict[int, str]:
+        if not self._flags['version']: return dict()
+        with timed('service_detection'):
+            detected = detect_services(self._target_ip, open_ports)
+        return {port: f' | {green(result["product"])} {result["version"]}'.rstrip()
+                for port, result in detected.items() if result}
 
 
     def _display_result(self, flag:str|None, port:int, description:str) -> None:
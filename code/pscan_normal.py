@@ -8,6 +8,8 @@ import threading, sys, time, random
 from scapy.layers.inet import IP, TCP, UDP
 from scapy.sendrecv    import sr1, sr, send
 from scapy.packet      import Packet
+from stats             import count, timed
+from rate_limit        import acquire, get_packet_interval
 
 
 class Normal_Scan:
@@ -16,7 +18,7 @@ class Normal_Scan:
         self._target_ip:str   = target_ip
         self._ports:list|int  = ports
         self._arg_flags:dict  = arg_flags
-        self._packets:list    = [self._create_tcp_syn_packet(port) for port in self._ports]
+        self._packets:list    = self._create_tcp_syn_packets()
         self._delay:int|float = None
         self._lock            = threading.Lock()
         self._responses:list  = list()
@@ -38,6 +40,12 @@ class Normal_Scan:
 
     # PACKETS ------------------------------------------------------------------------------------------------
 
+    def _create_tcp_syn_packets(self) -> list[Packet]:
+        with timed('packet_build'):
+            packets = [self._create_tcp_syn_packet(port) for port in self._ports]
+        count('packets_built', len(packets))
+        return packets
+
     def _create_tcp_syn_packet(self, port:int) -> Packet:
         return IP(dst=self._target_ip) / TCP(dport=port, flags="S")
     
@@ -54,7 +62,11 @@ class Normal_Scan:
     # NORMAL SENDING -----------------------------------------------------------------------------------------
 
     def _send_packets(self) -> list[Packet]:
-        responses, _ = sr(self._packets, inter=0.1, timeout=3, verbose=0)
+        acquire(len(self._packets))
+        with timed('send_receive'):
+            responses, _ = sr(self._packets, inter=get_packet_interval(0.1), timeout=3, verbose=0, chainCC=True)
+        count('packets_sent', len(self._packets))
+        count('replies_matched', len(responses))
         return responses
 
     
@@ -62,9 +74,11 @@ class Normal_Scan:
         responses   = self._send_packets()
         ack_packets = [self._create_tcp_ack_packet(pkt[TCP].sport, pkt.seq, pkt.ack) for _, pkt in responses]
         fin_packets = [self._create_tcp_fin_packet(pkt[TCP].sport) for _, pkt in responses]
-        send(ack_packets, verbose=0)
+        acquire(len(ack_packets) + len(fin_packets))
+        with timed('send'): send(ack_packets, inter=get_packet_interval(), verbose=0)
         time.sleep(1)
-        send(fin_packets, verbose=0)
+        with timed('send'): send(fin_packets, inter=get_packet_interval(), verbose=0)
+        count('packets_sent', len(ack_packets) + len(fin_packets))
         self._responses = responses
 
 
@@ -99,6 +113,10 @@ class Normal_Scan:
 
 
     def _async_send_packet(self, packet:Packet) -> None:
-        response = sr1(packet, timeout=3, verbose=0)
+        acquire()
+        with timed('send_receive'):
+            response = sr1(packet, timeout=3, verbose=0, chainCC=True)
+        count('packets_sent')
+        count('replies_matched', response is not None)
         with self._lock:
             self._responses.append((packet, response))
@@ -0,0 +1,49 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import threading, time
+
+
+class Rate_Limiter:
+    """
+    Packet budget shared by every scan of the process. Each request reserves its
+    slot in a virtual timeline, so a large batch delays the following callers
+    instead of exceeding the rate. The packets of a batch are then paced with
+    get_packet_interval(), which spreads them over the slots they reserved.
+    """
+
+    def __init__(self, rate:float) -> None:
+        self._rate:float      = rate
+        self._next_slot:float = time.monotonic()
+        self._lock            = threading.Lock()
+
+
+    def _acquire(self, amount:int=1) -> None:
+        with self._lock:
+            now             = time.monotonic()
+            start           = max(now, self._next_slot)
+            self._next_slot = start + amount / self._rate
+        if start > now: time.sleep(start - now)
+
+
+
+# SHARED LIMITER =============================================================================================
+
+_LIMITER:Rate_Limiter = None
+
+
+def set_rate_limit(rate:float|None) -> None:
+    global _LIMITER
+    _LIMITER = Rate_Limiter(rate) if rate else None
+
+
+def acquire(amount:int=1) -> None:
+    if _LIMITER and amount > 0: _LIMITER._acquire(amount)
+
+
+def get_packet_interval(minimum:float=0.0) -> float:
+    """Value for the 'inter' argument of scapy's send functions."""
+    return max(minimum, 1 / _LIMITER._rate) if _LIMITER else minimum
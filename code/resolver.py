@@ -0,0 +1,199 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import socket, struct, random
+from concurrent.futures import ThreadPoolExecutor
+from stats              import count, timed
+from ttl_cache          import TTL_Cache
+
+
+class DNS_Resolver:
+    """
+    Resolves many names at once using a thread pool around getaddrinfo/gethostbyaddr.
+    Results are kept in a TTL cache bounded by size (LRU eviction); failures get a
+    short TTL of their own, so a transient error does not hide a name for long.
+    With a nameserver, queries go straight to it over UDP instead of the system
+    resolver, which also allows testing against a local DNS stand-in.
+    """
+
+    def __init__(self, ttl:int|float=300, max_size:int=4096, workers:int=32,
+                 forward_func=None, reverse_func=None, nameserver:tuple[str, int]=None,
+                 negative_ttl:int|float=30) -> None:
+        self._negative_ttl:float = negative_ttl
+        self._workers:int        = workers
+        self._nameserver:tuple   = nameserver
+        self._forward_func       = forward_func or (self._query_address if nameserver else self._getaddrinfo)
+        self._reverse_func       = reverse_func or (self._query_pointer if nameserver else self._gethostbyaddr)
+        self._cache:TTL_Cache    = TTL_Cache(ttl, max_size)
+
+
+    def _clear(self) -> None:
+        self._cache._clear()
+
+
+    # LOOKUPS ----------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def _getaddrinfo(hostname:str) -> str:
+        result = socket.getaddrinfo(hostname, None, socket.AF_INET, socket.SOCK_STREAM)
+        return result[0][4][0]
+
+
+    @staticmethod
+    def _gethostbyaddr(ip:str) -> str:
+        return socket.gethostbyaddr(ip)[0]
+
+
+    def _query_address(self, hostname:str) -> str|None:
+        return query_dns(self._nameserver, hostname, DNS_TYPE_A)
+
+
+    def _query_pointer(self, ip:str) -> str|None:
+        return query_dns(self._nameserver, '.'.join(reversed(ip.split('.'))) + '.in-addr.arpa', DNS_TYPE_PTR)
+
+
+    def _lookup(self, kind:str, name:str, func) -> str|None:
+        found, value = self._cache._get((kind, name))
+        count('dns_cache_hits' if found else 'dns_lookups')
+        if found: return value
+        try:
+            with timed('dns'): value = func(name)
+        except (OSError, UnicodeError, ValueError, IndexError, struct.error): value = None
+        self._cache._set((kind, name), value, self._negative_ttl if value is None else None)
+        return value
+
+
+    def _resolve(self, hostname:str) -> str|None:
+        if is_ipv4_address(hostname): return hostname
+        return self._lookup('A', hostname, self._forward_func)
+
+
+    def _reverse(self, ip:str) -> str|None:
+        return self._lookup('PTR', ip, self._reverse_func)
+
+
+    def _resolve_many(self, hostnames:list[str]) -> dict[str, str|None]:
+        return self._run_concurrently(self._resolve, hostnames)
+
+
+    def _reverse_many(self, ips:list[str]) -> dict[str, str|None]:
+        return self._run_concurrently(self._reverse, ips)
+
+
+    def _run_concurrently(self, func, names:list[str]) -> dict[str, str|None]:
+        unique = list(dict.fromkeys(names))
+        if len(unique) <= 1:
+            return {name: func(name) for name in unique}
+        with ThreadPoolExecutor(max_workers=min(self._workers, len(unique))) as executor:
+            return dict(zip(unique, executor.map(func, unique)))
+
+
+
+# DNS CLIENT =================================================================================================
+
+DNS_TYPE_A   = 1
+DNS_TYPE_PTR = 12
+
+
+def query_dns(nameserver:tuple[str, int], name:str, record_type:int, timeout:float=2.0, attempts:int=2) -> str|None:
+    """Minimal UDP query; returns the first A/PTR answer, None for NXDOMAIN or no answer."""
+    query_id = random.getrandbits(16)
+    query    = build_dns_query(name, record_type, query_id)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        for _ in range(attempts):
+            sock.sendto(query, nameserver)
+            try:
+                while True:
+                    data, _ = sock.recvfrom(4096)
+                    if len(data) >= 12 and struct.unpack_from('!H', data)[0] == query_id:
+                        return parse_dns_answer(data, record_type)
+            except socket.timeout:
+                continue
+    raise socket.timeout(f'No answer from {nameserver[0]}:{nameserver[1]}')
+
+
+def build_dns_query(name:str, record_type:int, query_id:int) -> bytes:
+    labels = [label.encode('idna') for label in name.rstrip('.').split('.')]
+    if any(not label or len(label) > 63 for label in labels): raise ValueError(f'Invalid name "{name}"')
+    qname  = b''.join(bytes([len(label)]) + label for label in labels) + b'\x00'
+    return struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0) + qname + struct.pack('!HH', record_type, 1)
+
+
+def parse_dns_answer(data:bytes, record_type:int) -> str|None:
+    flags, questions, answers = struct.unpack_from('!HHH', data, 2)
+    if flags & 0x000f: return None
+    offset = 12
+    for _ in range(questions):
+        _, offset = read_dns_name(data, offset)
+        offset += 4
+    for _ in range(answers):
+        _, offset = read_dns_name(data, offset)
+        kind, _, _, length = struct.unpack_from('!HHIH', data, offset)
+        offset += 10
+        if kind == record_type == DNS_TYPE_A and length == 4: return socket.inet_ntoa(data[offset:offset + 4])
+        if kind == record_type == DNS_TYPE_PTR:               return read_dns_name(data, offset)[0]
+        offset += length
+    return None
+
+
+def read_dns_name(data:memoryview, offset:int) -> tuple[str, int]:
+    labels = list()
+    end    = None
+    jumps  = 0
+    while True:
+        length = data[offset]
+        if length & 0xc0 == 0xc0:
+            if end is None: end = offset + 2
+            offset = (length & 0x3f) << 8 | data[offset + 1]
+            jumps += 1
+            if jumps > 16: raise ValueError('DNS compression loop')
+            continue
+        if length == 0:
+            return '.'.join(labels), end if end is not None else offset + 1
+        labels.append(bytes(data[offset + 1:offset + 1 + length]).decode('utf-8', errors='replace'))
+        offset += 1 + length
+
+
+
+# SHARED RESOLVER ============================================================================================
+
+_RESOLVER = DNS_Resolver()
+
+
+def set_nameserver(address:str) -> None:
+    """Sends every lookup of the process to address ('ip' or 'ip:port') instead of the system resolver."""
+    global _RESOLVER
+    host, _, port = address.partition(':')
+    if not is_ipv4_address(host) or (port and not port.isdigit()):
+        raise ValueError(f'Invalid nameserver "{address}" (expected IP or IP:PORT)')
+    _RESOLVER = DNS_Resolver(nameserver=(host, int(port or 53)))
+
+
+def is_ipv4_address(value:str) -> bool:
+    try:
+        socket.inet_pton(socket.AF_INET, value)
+        return True
+    except (OSError, TypeError):
+        return False
+
+
+def resolve_hostname(hostname:str) -> str:
+    ip = _RESOLVER._resolve(hostname)
+    if ip is None: raise ValueError(f'Unable to resolve "{hostname}"')
+    return ip
+
+
+def resolve_hostnames(hostnames:list[str]) -> dict[str, str|None]:
+    return _RESOLVER._resolve_many(hostnames)
+
+
+def reverse_lookup(ip:str) -> str|None:
+    return _RESOLVER._reverse(ip)
+
+
+def reverse_lookups(ips:list[str]) -> dict[str, str|None]:
+    return _RESOLVER._reverse_many(ips)
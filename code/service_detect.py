@@ -0,0 +1,256 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import socket, re, os, json, hashlib, sys, threading
+from concurrent.futures import ThreadPoolExecutor
+from rate_limit         import acquire
+
+
+SIGNATURES_FILE  = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'service_signatures.txt')
+CACHE_FILE       = os.path.join(os.path.expanduser('~'), '.cache', 'netxplorer', 'signatures.json')
+VOLATILE_HEADERS = re.compile(rb'^(?:date|expires|last-modified|set-cookie|etag|age|content-length|x-request-id)[ \t]*:[^\n]*\n?',
+                               re.IGNORECASE | re.MULTILINE)
+
+
+class Signature_Database:
+    """
+    Signatures are anchored at the start of the response and tried in file order
+    with match(). Each one carries the longest literal that every match must
+    contain (e.g. "\r\nServer: nginx"), and only the signatures whose literal
+    occurs in the response reach the regex engine, so thousands of signatures cost
+    a few substring searches per banner. The parsed database is cached on disk as
+    JSON, keyed by the hash of the signature file; the cache is only trusted when it
+    belongs to the current user and its patterns pass the same checks as the file.
+    """
+
+    def __init__(self, signatures_file:str=SIGNATURES_FILE, cache_file:str|None=CACHE_FILE) -> None:
+        self._signatures_file:str = signatures_file
+        self._cache_file:str      = cache_file
+        self._probes:dict         = None
+        self._compiled:dict       = dict()
+        self._lock                = threading.Lock()
+
+
+    def _load(self) -> dict:
+        with self._lock:
+            if self._probes is None:
+                with open(self._signatures_file, 'rb') as file: content = file.read()
+                key           = hashlib.sha256(content + sys.version.encode()).hexdigest()
+                self._probes  = self._read_cache(key) or self._build(content, key)
+            return self._probes
+
+
+    def _read_cache(self, key:str) -> dict|None:
+        if not self._cache_file: return None
+        try:
+            with open(self._cache_file) as file:
+                status = os.fstat(file.fileno())
+                if status.st_uid != os.geteuid() or status.st_mode & 0o022: return None
+                cached = json.load(file)
+            if cached.get('key') != key: return None
+            probes = {probe: [tuple(signature) for signature in signatures] for probe, signatures in cached['probes'].items()}
+            for signatures in probes.values():
+                for _, _, _, regex, literal in signatures:
+                    if get_required_literal(check_signature(regex)) != literal: return None
+            return probes
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, re.error):
+            return None
+
+
+    def _write_cache(self, key:str, probes:dict) -> None:
+        if not self._cache_file: return
+        try:
+            os.makedirs(os.path.dirname(self._cache_file), exist_ok=True)
+            temporary = f'{self._cache_file}.{os.getpid()}'
+            with open(temporary, 'w') as file: json.dump({'key': key, 'probes': probes}, file)
+            os.replace(temporary, self._cache_file)
+        except OSError:
+            pass
+
+
+    def _build(self, content:bytes, key:str) -> dict:
+        probes = dict()
+        for number, line in enumerate(content.decode('latin-1').splitlines(), 1):
+            if not line.strip() or line.startswith('#'): continue
+            probe, service, product, version, regex = line.split('\t', 4)
+            try:
+                literal = get_required_literal(check_signature(regex))
+            except (ValueError, re.error) as error:
+                raise ValueError(f'Invalid signature on line {number}: {error}')
+            probes.setdefault(probe, list()).append((service, product, version, regex, literal))
+        self._write_cache(key, probes)
+        return probes
+
+
+    def _get_signatures(self, probe:str) -> list[tuple]:
+        signatures = self._compiled.get(probe)
+        if signatures is None and probe in self._load():
+            signatures = [(re.compile(regex.encode('latin-1'), re.DOTALL), literal.encode('latin-1'), service, product, version)
+                          for service, product, version, regex, literal in self._probes[probe]]
+            self._compiled[probe] = signatures
+        return signatures
+
+
+    def _match(self, probe:str, response:bytes) -> dict|None:
+        signatures = self._get_signatures(probe)
+        if signatures is None or not response: return None
+        for pattern, literal, service, product, version in signatures:
+            if literal not in response: continue
+            found = pattern.match(response)
+            if found: return {'service': service, 'product': product, 'version': self._format_version(version, found)}
+        return None
+
+
+    @staticmethod
+    def _format_version(template:str, found:re.Match) -> str:
+        if template == '-': return ''
+        def replace(group:re.Match) -> str:
+            value = found.group(int(group.group(1)))
+            return value.decode('latin-1') if value else ''
+        return re.sub(r'\$(\d)', replace, template).strip()
+
+
+    def _preload(self) -> None:
+        for probe in self._load(): self._get_signatures(probe)
+
+
+
+# SIGNATURE ANALYSIS =========================================================================================
+
+ESCAPED_BYTES = {'r': '\r', 'n': '\n', 't': '\t', 'f': '\f', 'v': '\v', '0': '\x00'}
+
+
+def check_signature(regex:str) -> str:
+    """Signatures must compile and be anchored with '^' (no top-level alternation)."""
+    compiled = re.compile(regex.encode('latin-1'))
+    if not regex.startswith('^') or split_top_level(regex) is None:
+        raise ValueError('the regex must start with ^ and have no top-level alternation')
+    if compiled.flags & re.IGNORECASE:
+        raise ValueError('case-insensitive signatures are not supported')
+    return regex
+
+
+def get_required_literal(regex:str) -> str:
+    """Longest run of literal characters outside groups and classes, so every match contains it."""
+    runs = split_top_level(regex) or list()
+    return max(runs, key=len, default='')
+
+
+def split_top_level(regex:str) -> list[str]|None:
+    """Literal runs at the top level of the regex; None if it has a top-level '|'."""
+    runs, current, index = list(), '', 0
+    while index < len(regex):
+        char = regex[index]
+        if char == '\\':
+            escaped = regex[index + 1:index + 2]
+            if escaped == 'x':
+                atom, index = chr(int(regex[index + 2:index + 4], 16)), index + 4
+            elif escaped in ESCAPED_BYTES:
+                atom, index = ESCAPED_BYTES[escaped], index + 2
+            elif escaped.isalnum():
+                atom, index = None, index + 2
+            else:
+                atom, index = escaped, index + 2
+        elif char in '[(':
+            atom, index = None, skip_group(regex, index)
+        elif char == '|':
+            return None
+        elif char in '*?{':
+            current = current[:-1]
+            atom, index = None, (regex.find('}', index) + 1 or len(regex)) if char == '{' else index + 1
+        elif char in '.^$+':
+            atom, index = None, index + 1
+        else:
+            atom, index = char, index + 1
+
+        if atom is None:
+            runs.append(current)
+            current = ''
+        else:
+            current += atom
+    return runs + [current]
+
+
+def skip_group(regex:str, index:int) -> int:
+    """Index after the class or group that starts at index."""
+    depth, in_class = 0, False
+    while index < len(regex):
+        char = regex[index]
+        if char == '\\':
+            index += 2
+            continue
+        if in_class:
+            if char == ']' and regex[index - 1] not in '[^': in_class = False
+        elif char == '[': in_class = True
+        elif char == '(': depth += 1
+        elif char == ')': depth -= 1
+        index += 1
+        if depth == 0 and not in_class: return index
+    return index
+
+
+
+# PROBES =====================================================================================================
+
+PROBES = {
+    'NULL':         {'payload': b'',                                    'ports': None},
+    'GetRequest':   {'payload': b'GET / HTTP/1.0\r\n\r\n',              'ports': {80, 443, 631, 5000, 7070, 8000, 8080, 8443, 8888, 10000, 20000}},
+    'Redis':        {'payload': b'INFO server\r\n',                     'ports': {6379}},
+    'Memcached':    {'payload': b'version\r\n',                         'ports': {11211}},
+    'GenericLines': {'payload': b'\r\n\r\n',                            'ports': None},
+}
+
+_DATABASE = Signature_Database()
+
+
+def get_signature_database() -> Signature_Database:
+    return _DATABASE
+
+
+def send_probe(host:str, port:int, payload:bytes, timeout:float) -> bytes:
+    acquire()
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        if payload: sock.sendall(payload)
+        try:    return sock.recv(4096)
+        except socket.timeout: return b''
+
+
+def grab_banner(host:str, port:int, timeout:float=3.0) -> bytes:
+    for probe in get_probe_order(port):
+        try:    response = send_probe(host, port, PROBES[probe]['payload'], timeout)
+        except OSError: return b''
+        if response: return response
+    return b''
+
+
+def get_banner_fingerprint(port:int, banner:bytes) -> bytes:
+    """Stable form of a banner: the matched product/version, or the response without volatile HTTP data."""
+    for probe in get_probe_order(port):
+        result = _DATABASE._match(probe, banner)
+        if result: return f'{result["service"]}|{result["product"]}|{result["version"]}'.encode()
+    if banner.startswith(b'HTTP/'): banner = banner.split(b'\r\n\r\n', 1)[0]
+    return VOLATILE_HEADERS.sub(b'', banner)
+
+
+def get_probe_order(port:int) -> list[str]:
+    specific = [name for name, probe in PROBES.items() if probe['ports'] and port in probe['ports']]
+    generic  = [name for name, probe in PROBES.items() if probe['ports'] is None]
+    return specific + generic
+
+
+def detect_service(host:str, port:int, timeout:float=3.0) -> dict|None:
+    for probe in get_probe_order(port):
+        try:    response = send_probe(host, port, PROBES[probe]['payload'], timeout)
+        except OSError: return None
+        result = _DATABASE._match(probe, response)
+        if result: return result
+    return None
+
+
+def detect_services(host:str, ports:list[int], timeout:float=3.0, workers:int=32) -> dict[int, dict|None]:
+    if not ports: return dict()
+    with ThreadPoolExecutor(max_workers=min(workers, len(ports))) as executor:
+        return dict(zip(ports, executor.map(lambda port: detect_service(host, port, timeout), ports)))
@@ -45,15 +45,28 @@ SCRIPTS_DIR=$(dirname "$(realpath "$0")")        # Directory containing the curr
 SOURCE_DIR=${SCRIPTS_DIR%/*}                     # Parent directory of the script's directory
 FILES=("arg_parser.py"                           # List of required Python scripts
        "bgrab.py"
+       "checkpoint.py"
+       "daemon.py"
        "display.py"
        "main.py"
+       "monitor.py"
        "netmap.py"
        "network.py"
+       "passive.py"
+       "pcap_reader.py"
+       "permutation.py"
        "pkt_builder.py"
        "pkt_sender.py"
        "pscan.py"
        "pscan_decoy.py"
        "pscan_normal.py"
+       "rate_limit.py"
+       "resolver.py"
+       "service_detect.py"
+       "service_signatures.txt"
+       "stats.py"
+       "tls_inventory.py"
+       "ttl_cache.py"
        )
 
 
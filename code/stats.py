@@ -0,0 +1,137 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import cProfile, pstats, os, sys, threading, time
+from collections import defaultdict
+from contextlib  import contextmanager
+from display     import *
+
+
+class Scan_Stats:
+
+    def __init__(self) -> None:
+        self._counters:defaultdict = defaultdict(int)
+        self._timings:defaultdict  = defaultdict(float)
+        self._lock                 = threading.Lock()
+        self._started:float        = time.perf_counter()
+
+
+    def _count(self, name:str, amount:int=1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+
+    def _add_time(self, stage:str, seconds:float) -> None:
+        with self._lock:
+            self._timings[stage] += seconds
+
+
+    def _reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self._started = time.perf_counter()
+
+
+    def _snapshot(self) -> tuple[dict, dict, float]:
+        with self._lock:
+            return dict(self._counters), dict(self._timings), time.perf_counter() - self._started
+
+
+
+class Stats_Session:
+    """
+    Wraps the execution of a command: periodic live lines, a final report of the
+    stage timings and counters, and an optional cProfile dump with the share of
+    time spent inside scapy versus NetXplorer code.
+    """
+
+    def __init__(self, options:dict) -> None:
+        self._options:dict                = options
+        self._profiler:cProfile.Profile   = None
+        self._live_thread:threading.Thread = None
+        self._stop_event                  = threading.Event()
+
+
+    def __enter__(self):
+        STATS._reset()
+        if self._options.get('live'):    self._start_live_stats()
+        if self._options.get('profile'): self._start_profiler()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop_event.set()
+        if self._profiler:           self._stop_profiler()
+        if self._options.get('stats'): display_stats()
+        return False
+
+
+    def _start_live_stats(self) -> None:
+        self._live_thread = threading.Thread(target=self._live_stats_loop, daemon=True)
+        self._live_thread.start()
+
+
+    def _live_stats_loop(self) -> None:
+        interval = float(self._options['live'])
+        while not self._stop_event.wait(interval):
+            counters, _, elapsed = STATS._snapshot()
+            values = ' '.join(f'{name}={value}' for name, value in sorted(counters.items()))
+            sys.stderr.write(f'[stats {elapsed:7.1f}s] {values}\n')
+            sys.stderr.flush()
+
+
+    def _start_profiler(self) -> None:
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+
+    def _stop_profiler(self) -> None:
+        self._profiler.disable()
+        self._profiler.dump_stats(self._options['profile'])
+        print(f'Profile saved to {self._options["profile"]}')
+        display_time_shares(pstats.Stats(self._profiler))
+
+
+
+# SHARED STATS ===============================================================================================
+
+STATS = Scan_Stats()
+
+
+def count(name:str, amount:int=1) -> None:
+    STATS._count(name, amount)
+
+
+@contextmanager
+def timed(stage:str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STATS._count(f'{stage}_errors')
+        raise
+    finally:
+        STATS._add_time(stage, time.perf_counter() - start)
+
+
+def display_stats() -> None:
+    counters, timings, elapsed = STATS._snapshot()
+    print(f'\n{green("Stats")} (total {elapsed:.3f}s)')
+    for stage, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f'  {stage:<22} {seconds:>10.4f}s')
+    for name, value in sorted(counters.items()):
+        print(f'  {name:<22} {value:>10}')
+
+
+def display_time_shares(profile:pstats.Stats) -> None:
+    own_dir = os.path.dirname(os.path.abspath(__file__))
+    shares  = defaultdict(float)
+    for (filename, _, _), (_, _, total_time, _, _) in profile.stats.items():
+        if   f'{os.sep}scapy{os.sep}' in filename: shares['scapy'] += total_time
+        elif filename.startswith(own_dir):         shares['netxplorer'] += total_time
+        else:                                      shares['other'] += total_time
+    total = sum(shares.values()) or 1
+    print('Time share: ' + ', '.join(f'{name} {seconds / total:.1%}' for name, seconds in sorted(shares.items())))
@@ -0,0 +1,247 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import socket, ssl, hashlib, threading, os
+from datetime           import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from arg_parser         import Argument_Manager as ArgParser
+from resolver           import resolve_hostnames
+from stats              import count, timed
+from rate_limit         import acquire
+from ttl_cache          import TTL_Cache
+from display            import *
+
+
+class TLS_Inventory:
+
+    def __init__(self, parser_manager:ArgParser) -> None:
+        self._endpoints:list[tuple[str, int]] = None
+        self._flags:dict                      = None
+        self._get_argument_and_flags(parser_manager)
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+    def _execute(self) -> None:
+        try:
+            results = self._collect_certificates()
+            self._display_results(results)
+        except KeyboardInterrupt:   print(f'\n{red("Process stopped")}')
+        except ValueError as error: print(f'{yellow("Error")}: {error}')
+        except Exception as error:  print(unexpected_error(error))
+
+
+    def _get_argument_and_flags(self, parser_manager:ArgParser) -> None:
+        self._flags = {
+            'port':     int(parser_manager.port) if parser_manager.port else 443,
+            'workers':  int(parser_manager.workers) if parser_manager.workers else 64,
+            'timeout':  float(parser_manager.timeout) if parser_manager.timeout else 5.0,
+            'expiring': int(parser_manager.expiring) if parser_manager.expiring else None,
+        }
+        self._endpoints = self._parse_endpoints(parser_manager.targets)
+
+
+    def _parse_endpoints(self, targets:str) -> list[tuple[str, int]]:
+        if os.path.isfile(targets):
+            with open(targets) as file:
+                entries = [line.strip() for line in file if line.strip() and not line.startswith('#')]
+        else:
+            entries = [entry.strip() for entry in targets.split(',') if entry.strip()]
+
+        endpoints = list()
+        for entry in entries:
+            host, _, port = entry.partition(':')
+            endpoints.append((host, int(port) if port else self._flags['port']))
+        return endpoints
+
+
+    def _collect_certificates(self) -> list[dict]:
+        addresses = resolve_hostnames([host for host, _ in self._endpoints])
+        jobs      = [(host, addresses[host], port) for host, port in dict.fromkeys(self._endpoints)]
+        workers   = max(1, min(self._flags['workers'], len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda job: self._collect_one(*job), jobs))
+
+
+    def _collect_one(self, host:str, ip:str|None, port:int) -> dict:
+        if ip is None:
+            return {'host': host, 'port': port, 'error': 'Unable to resolve'}
+        try:
+            return {'host': host, 'port': port, **get_certificate(ip, port, host, self._flags['timeout'])}
+        except (OSError, ssl.SSLError, ValueError) as error:
+            return {'host': host, 'port': port, 'error': str(error) or type(error).__name__}
+
+
+    def _display_results(self, results:list[dict]) -> None:
+        limit = self._flags['expiring']
+        for result in sorted(results, key=lambda res: get_days_left(res) if 'error' not in res else float('inf')):
+            endpoint = f'{result["host"]}:{result["port"]}'
+            if 'error' in result:
+                if limit is None: print(f'{red("Failed")} {endpoint:<30} {result["error"]}')
+                continue
+            if limit is not None and get_days_left(result) > limit: continue
+            self._display_certificate(endpoint, result)
+
+
+    @staticmethod
+    def _display_certificate(endpoint:str, result:dict) -> None:
+        days   = get_days_left(result)
+        status = red('Expired') if days < 0 else yellow('Expiring') if days <= 30 else green('Valid')
+        print(f'{status} {endpoint:<30} CN={result["subject"].get("CN", "-")}, '
+              f'Issuer={result["issuer"].get("CN", result["issuer"].get("O", "-"))}, '
+              f'Expires={result["not_after"]:%Y-%m-%d} ({days} days), SHA256={result["sha256"]}')
+        if result['san']: print(f'  - SAN: {", ".join(result["san"])}')
+
+
+
+# SHARED TLS STATE ===========================================================================================
+
+_TLS_CONTEXT:ssl.SSLContext = None
+_CONTEXT_LOCK               = threading.Lock()
+_SESSIONS:TTL_Cache         = None
+_CERTIFICATES               = TTL_Cache(ttl=300)
+
+
+def get_tls_context() -> ssl.SSLContext:
+    global _TLS_CONTEXT
+    with _CONTEXT_LOCK:
+        if _TLS_CONTEXT is None:
+            context                = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode    = ssl.CERT_NONE
+            _TLS_CONTEXT           = context
+        return _TLS_CONTEXT
+
+
+def enable_session_cache(ttl:int|float=3600) -> None:
+    """Keeps sessions for resumption; only worth it in a long-running process (daemon)."""
+    global _SESSIONS
+    if _SESSIONS is None: _SESSIONS = TTL_Cache(ttl)
+
+
+def get_certificate(ip:str, port:int, server_name:str=None, timeout:float=5.0) -> dict:
+    key                 = (ip, port, server_name)
+    cached, certificate = _CERTIFICATES._get(key)
+    if cached: return certificate
+
+    sessions = _SESSIONS
+    session  = sessions._get(key)[1] if sessions else None
+    acquire()
+    with timed('tls_handshake'), socket.create_connection((ip, port), timeout=timeout) as sock:
+        with get_tls_context().wrap_socket(sock, server_hostname=server_name, session=session) as ssock:
+            der = ssock.getpeercert(binary_form=True)
+            if sessions: sessions._set(key, get_resumable_session(ssock))
+            count('tls_sessions_reused', ssock.session_reused)
+
+    if not der: raise ValueError('No certificate returned')
+    certificate = parse_certificate(der)
+    _CERTIFICATES._set(key, certificate)
+    return certificate
+
+
+def get_resumable_session(ssock:ssl.SSLSocket) -> ssl.SSLSession:
+    """TLS 1.3 tickets arrive after the handshake and are only processed by a read."""
+    if ssock.version() == 'TLSv1.3' and not ssock.session.has_ticket:
+        ssock.settimeout(0.05)
+        try:    ssock.recv(1)
+        except OSError: pass
+    return ssock.session
+
+
+def get_days_left(certificate:dict) -> int:
+    return (certificate['not_after'] - datetime.now(timezone.utc)).days
+
+
+
+# MINIMAL DER PARSER =========================================================================================
+
+OID_NAMES = {
+    b'\x55\x04\x03': 'CN',
+    b'\x55\x04\x06': 'C',
+    b'\x55\x04\x0a': 'O',
+    b'\x55\x04\x0b': 'OU',
+}
+OID_SUBJECT_ALT_NAME = b'\x55\x1d\x11'
+
+
+def parse_certificate(der:bytes) -> dict:
+    """Raises ValueError for truncated or malformed DER."""
+    try:
+        return decode_certificate(der)
+    except (IndexError, ValueError, UnicodeDecodeError) as error:
+        raise ValueError(f'Malformed certificate ({error or type(error).__name__})')
+
+
+def decode_certificate(der:bytes) -> dict:
+    _, cert_start, _         = read_tlv(der, 0)
+    _, tbs_start, tbs_end    = read_tlv(der, cert_start)
+    fields                   = list(iterate_tlv(der, tbs_start, tbs_end))
+    if fields[0][0] == 0xa0: fields = fields[1:]
+
+    serial, _, issuer, validity, subject = fields[:5]
+    not_before, not_after = [parse_time(der, tag, start, end) for tag, start, end in iterate_tlv(der, validity[1], validity[2])]
+    extensions            = next((field for field in fields[5:] if field[0] == 0xa3), None)
+
+    return {
+        'serial':     der[serial[1]:serial[2]].hex(),
+        'issuer':     parse_name(der, issuer[1], issuer[2]),
+        'subject':    parse_name(der, subject[1], subject[2]),
+        'not_before': not_before,
+        'not_after':  not_after,
+        'san':        parse_subject_alt_names(der, extensions) if extensions else list(),
+        'sha256':     hashlib.sha256(der).hexdigest(),
+    }
+
+
+def read_tlv(data:bytes, offset:int) -> tuple[int, int, int]:
+    tag    = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size   = length & 0x7f
+        length = int.from_bytes(data[offset:offset + size], 'big')
+        offset += size
+    if offset + length > len(data): raise ValueError('Truncated DER')
+    return tag, offset, offset + length
+
+
+def iterate_tlv(data:bytes, start:int, end:int):
+    while start < end:
+        tag, value_start, value_end = read_tlv(data, start)
+        yield tag, value_start, value_end
+        start = value_end
+
+
+def parse_name(data:bytes, start:int, end:int) -> dict:
+    name = dict()
+    for _, set_start, set_end in iterate_tlv(data, start, end):
+        for _, attr_start, attr_end in iterate_tlv(data, set_start, set_end):
+            (_, oid_start, oid_end), (_, value_start, value_end) = list(iterate_tlv(data, attr_start, attr_end))[:2]
+            key = OID_NAMES.get(bytes(data[oid_start:oid_end]))
+            if key: name.setdefault(key, bytes(data[value_start:value_end]).decode('utf-8', errors='replace'))
+    return name
+
+
+def parse_time(data:bytes, tag:int, start:int, end:int) -> datetime:
+    value  = bytes(data[start:end]).decode('ascii').rstrip('Z')
+    layout = '%y%m%d%H%M%S' if tag == 0x17 else '%Y%m%d%H%M%S'
+    return datetime.strptime(value, layout).replace(tzinfo=timezone.utc)
+
+
+def parse_subject_alt_names(data:bytes, extensions:tuple) -> list[str]:
+    _, seq_start, seq_end = read_tlv(data, extensions[1])
+    for _, ext_start, ext_end in iterate_tlv(data, seq_start, seq_end):
+        parts = list(iterate_tlv(data, ext_start, ext_end))
+        if bytes(data[parts[0][1]:parts[0][2]]) != OID_SUBJECT_ALT_NAME: continue
+        _, names_start, names_end = read_tlv(data, parts[-1][1])
+        return [bytes(data[start:end]).decode('ascii', errors='replace')
+                for tag, start, end in iterate_tlv(data, names_start, names_end) if tag == 0x82]
+    return list()
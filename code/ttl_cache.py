@@ -0,0 +1,47 @@
+# MIT License
+# Copyright (c) 2024 Oliver Calazans
+# Repository: https://github.com/olivercalazans/netxplorer
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software...
+
+
+import threading, time
+from collections import OrderedDict
+
+
+class TTL_Cache:
+    """
+    Thread-safe cache whose entries expire after a TTL and which is bounded by size,
+    evicting the least recently used entry first. None is a valid cached value, so
+    _get() also reports whether the key was found.
+    """
+
+    def __init__(self, ttl:int|float, max_size:int=4096) -> None:
+        self._ttl:float         = ttl
+        self._max_size:int      = max_size
+        self._cache:OrderedDict = OrderedDict()
+        self._lock              = threading.Lock()
+
+
+    def _get(self, key) -> tuple[bool, object]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None: return False, None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._cache[key]
+                return False, None
+            self._cache.move_to_end(key)
+            return True, value
+
+
+    def _set(self, key, value, ttl:int|float=None) -> None:
+        with self._lock:
+            self._cache[key] = (time.monotonic() + (self._ttl if ttl is None else ttl), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+
+
+    def _clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,89 @@
+import socket, struct
+from types   import SimpleNamespace
+from passive import Passive_Discovery, Host_Table, parse_frame
+
+
+MAC_A = b'\x02\x00\x00\x00\x00\x0a'
+MAC_B = b'\x02\x00\x00\x00\x00\x0b'
+
+
+def ethernet(ethertype:int, payload:bytes) -> bytes:
+    return b'\xff' * 6 + MAC_A + struct.pack('!H', ethertype) + payload
+
+
+def arp(sender_ip:str) -> bytes:
+    return ethernet(0x0806, struct.pack('!HHBBH', 1, 0x0800, 6, 4, 2) + MAC_A + socket.inet_aton(sender_ip)
+                    + MAC_B + socket.inet_aton('10.0.0.1'))
+
+
+def ipv4(source:str, protocol:int, payload:bytes, destination:str='10.0.0.1') -> bytes:
+    header = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + len(payload), 0, 0, 64, protocol, 0,
+                         socket.inet_aton(source), socket.inet_aton(destination))
+    return ethernet(0x0800, header + payload)
+
+
+def udp(source_port:int, dest_port:int, payload:bytes) -> bytes:
+    return struct.pack('!HHHH', source_port, dest_port, 8 + len(payload), 0) + payload
+
+
+def syn_ack(source:str, port:int) -> bytes:
+    return ipv4(source, 6, struct.pack('!HHIIBBHHH', port, 40000, 1, 1, 0x50, 0x12, 1024, 0, 0))
+
+
+def mdns_a_record(source:str, address:bytes) -> bytes:
+    name   = b'\x04host\x05local\x00'
+    record = name + struct.pack('!HHIH', 1, 1, 120, 4) + address
+    return ipv4(source, 17, udp(5353, 5353, struct.pack('!HHHHHH', 0, 0x8400, 0, 1, 0, 0) + record))
+
+
+def dhcp(options:bytes) -> bytes:
+    message = bytes([2, 1, 6, 0]) + bytes(8) + bytes(4) + bytes(8) + MAC_B + bytes(10) + bytes(192)
+    message += b'\x63\x82\x53\x63' + options + b'\xff'
+    return ipv4('10.0.0.1', 17, udp(67, 68, message), '255.255.255.255')
+
+
+def write_pcap(path, frames:list[bytes]) -> None:
+    with open(path, 'wb') as file:
+        file.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+        for frame in frames:
+            file.write(struct.pack('<IIII', 0, 0, len(frame), len(frame)) + frame)
+
+
+def replay(path) -> Passive_Discovery:
+    arguments = SimpleNamespace(iface='lo', read=str(path), timeout=None, max=None)
+    discovery = Passive_Discovery(arguments)
+    discovery._replay_pcap()
+    return discovery
+
+
+def test_replay_discovers_hosts(tmp_path):
+    write_pcap(tmp_path / 'valid.pcap', [arp('10.0.0.7'), syn_ack('10.0.0.8', 22),
+                                         mdns_a_record('10.0.0.9', socket.inet_aton('10.0.0.9'))])
+    hosts = dict(replay(tmp_path / 'valid.pcap')._hosts._items())
+    assert hosts['10.0.0.7']['mac'] == '02:00:00:00:00:0a'
+    assert hosts['10.0.0.8']['ports'] == {22}
+    assert hosts['10.0.0.9']['names'] == {'host.local'}
+
+
+def test_replay_survives_malformed_frames(tmp_path):
+    truncated_mdns = mdns_a_record('10.0.0.9', socket.inet_aton('10.0.0.9'))[:-2]
+    short_option   = dhcp(b'\x32\x02\x0a\x00')
+    valid          = [arp('10.0.0.7'), syn_ack('10.0.0.8', 22), mdns_a_record('10.0.0.9', b'\x0a\x00\x00\x09'), dhcp(b'')]
+    cut_frames     = [frame[:size] for frame in valid for size in range(0, len(frame), 3)]
+    write_pcap(tmp_path / 'malformed.pcap', [truncated_mdns, short_option, *cut_frames, arp('10.0.0.7')])
+    assert '10.0.0.7' in dict(replay(tmp_path / 'malformed.pcap')._hosts._items())
+
+
+def test_truncated_mdns_record_is_ignored():
+    hosts = Host_Table()
+    parse_frame(memoryview(mdns_a_record('10.0.0.9', b'\x0a\x00')), hosts)
+    assert len(hosts) == 0
+
+
+def test_names_and_ports_are_capped_per_host():
+    hosts = Host_Table(max_names=2, max_ports=3)
+    for port in range(10):
+        hosts._update('10.0.0.8', 'tcp', name=f'host{port}.local', port=port)
+    host = dict(hosts._items())['10.0.0.8']
+    assert host['names'] == {'host0.local', 'host1.local'}
+    assert host['ports'] == {0, 1, 2}
@@ -0,0 +1,41 @@
+import struct
+from pcap_reader import read_capture
+
+
+def block(block_type:int, body:bytes) -> bytes:
+    body += b'\x00' * (-len(body) % 4)
+    size  = len(body) + 12
+    return struct.pack('<II', block_type, size) + body + struct.pack('<I', size)
+
+
+SECTION   = block(0x0a0d0d0a, struct.pack('<IHHq', 0x1a2b3c4d, 1, 0, -1))
+INTERFACE = block(0x00000001, struct.pack('<HHI', 1, 0, 65535))
+
+
+def enhanced(frame:bytes, interface:int=0, captured:int=None) -> bytes:
+    captured = len(frame) if captured is None else captured
+    return block(0x00000006, struct.pack('<IIIII', interface, 0, 0, captured, len(frame)) + frame)
+
+
+def write(path, content:bytes) -> str:
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_pcapng_skips_invalid_records(tmp_path):
+    content = SECTION + enhanced(b'early') + INTERFACE + enhanced(b'x' * 20, captured=4000) \
+              + enhanced(b'x' * 14, interface=3) + enhanced(b'valid frame')
+    frames  = [(linktype, bytes(frame)) for linktype, frame in read_capture(write(tmp_path / 'bad.pcapng', content))]
+    assert frames == [(1, b'valid frame')]
+
+
+def test_truncated_pcap_header(tmp_path):
+    assert list(read_capture(write(tmp_path / 'short.pcap', b'\xd4\xc3\xb2\xa1' + b'\x00' * 10))) == []
+
+
+def test_pcap_stops_at_truncated_record(tmp_path):
+    header = struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1)
+    record = struct.pack('<IIII', 0, 0, 6, 6) + b'abcdef'
+    cut    = struct.pack('<IIII', 0, 0, 100, 100) + b'abc'
+    frames = [bytes(frame) for _, frame in read_capture(write(tmp_path / 'cut.pcap', header + record + cut))]
+    assert frames == [b'abcdef']
@@ -0,0 +1,35 @@
+import pytest
+from permutation import Cyclic_Permutation, is_prime, next_prime, parse_shard
+
+
+SIZES = sorted({*range(0, 300), 1021, 1024, 4093, 4096, 10007, 65534, 65535})
+
+
+@pytest.mark.parametrize('shards', (1, 2, 3, 7))
+def test_shards_are_disjoint_and_cover_every_index(shards):
+    for size in SIZES:
+        seen = list()
+        for shard in range(shards):
+            seen.extend(Cyclic_Permutation(size, seed=size, shard=shard, shards=shards))
+        assert len(seen) == size, size
+        assert set(seen) == set(range(size)), size
+
+
+def test_same_seed_gives_same_order():
+    first  = list(Cyclic_Permutation(1000, seed=42))
+    second = list(Cyclic_Permutation(1000, seed=42))
+    assert first == second
+    assert first != list(range(1000))
+
+
+def test_primes():
+    assert [number for number in range(30) if is_prime(number)] == [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    assert next_prime(65536) == 65537
+    assert not is_prime(3215031751)
+
+
+def test_invalid_shards():
+    with pytest.raises(ValueError): Cyclic_Permutation(10, seed=1, shard=2, shards=2)
+    with pytest.raises(ValueError): Cyclic_Permutation(10, seed=1, shard=0, shards=0)
+    with pytest.raises(ValueError): parse_shard('1-4')
+    assert parse_shard('1/4') == (1, 4)
@@ -0,0 +1,98 @@
+import socket, struct, threading, time
+import pytest
+from resolver import DNS_Resolver, read_dns_name, DNS_TYPE_A, DNS_TYPE_PTR
+
+
+RECORDS = {
+    ('host.test', DNS_TYPE_A):               socket.inet_aton('10.1.2.3'),
+    ('3.2.1.10.in-addr.arpa', DNS_TYPE_PTR): b'\x04host\x04test\x00',
+}
+
+
+@pytest.fixture
+def nameserver():
+    """Local stand-in DNS server: answers RECORDS, NXDOMAIN for anything else."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(('127.0.0.1', 0))
+    server.settimeout(0.1)
+    queries = list()
+    running = threading.Event()
+    running.set()
+
+    def serve():
+        while running.is_set():
+            try:    data, client = server.recvfrom(512)
+            except socket.timeout: continue
+            name, offset = read_dns_name(data, 12)
+            record_type  = struct.unpack_from('!H', data, offset)[0]
+            question     = data[12:offset + 4]
+            queries.append(name)
+            answer       = RECORDS.get((name, record_type))
+            flags        = 0x8180 if answer else 0x8183
+            header       = data[:2] + struct.pack('!HHHHH', flags, 1, 1 if answer else 0, 0, 0)
+            record       = b'\xc0\x0c' + struct.pack('!HHIH', record_type, 1, 60, len(answer)) + answer if answer else b''
+            server.sendto(header + question + record, client)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield server.getsockname(), queries
+    running.clear()
+    thread.join()
+    server.close()
+
+
+def test_nameserver_forward_and_reverse(nameserver):
+    address, queries = nameserver
+    resolver = DNS_Resolver(nameserver=address)
+    assert resolver._resolve('host.test') == '10.1.2.3'
+    assert resolver._reverse('10.1.2.3') == 'host.test'
+    assert resolver._resolve('missing.test') is None
+    assert resolver._resolve('host.test') == '10.1.2.3'
+    assert queries == ['host.test', '3.2.1.10.in-addr.arpa', 'missing.test']
+
+
+def test_ttl_expiry():
+    calls    = list()
+    resolver = DNS_Resolver(ttl=0.05, forward_func=lambda name: calls.append(name) or '10.0.0.1')
+    resolver._resolve('a.test')
+    resolver._resolve('a.test')
+    time.sleep(0.06)
+    resolver._resolve('a.test')
+    assert calls == ['a.test', 'a.test']
+
+
+def test_failures_use_the_negative_ttl():
+    answers  = iter([OSError('transient'), '10.0.0.1'])
+    def forward(name:str) -> str:
+        answer = next(answers)
+        if isinstance(answer, Exception): raise answer
+        return answer
+    resolver = DNS_Resolver(ttl=300, negative_ttl=0.05, forward_func=forward)
+    assert resolver._resolve('a.test') is None
+    assert resolver._resolve('a.test') is None
+    time.sleep(0.06)
+    assert resolver._resolve('a.test') == '10.0.0.1'
+
+
+def test_lru_eviction():
+    calls    = list()
+    resolver = DNS_Resolver(max_size=2, forward_func=lambda name: calls.append(name) or '10.0.0.1')
+    resolver._resolve('a.test')
+    resolver._resolve('b.test')
+    resolver._resolve('a.test')
+    resolver._resolve('c.test')
+    resolver._resolve('a.test')
+    resolver._resolve('b.test')
+    assert calls == ['a.test', 'b.test', 'c.test', 'b.test']
+
+
+def test_resolve_many_runs_concurrently():
+    def slow_forward(name:str) -> str:
+        time.sleep(0.2)
+        return f'10.0.0.{name.split(".")[0]}'
+    resolver = DNS_Resolver(workers=32, forward_func=slow_forward)
+    names    = [f'{index}.test' for index in range(32)] * 2
+    start    = time.perf_counter()
+    result   = resolver._resolve_many(names)
+    assert time.perf_counter() - start < 1
+    assert result == {f'{index}.test': f'10.0.0.{index}' for index in range(32)}
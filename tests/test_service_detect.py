@@ -0,0 +1,64 @@
+import json, time
+import pytest
+from service_detect import Signature_Database, get_required_literal
+
+
+HTTP_SIGNATURE = 'GetRequest\thttp\tProduct{0}\t$1\t^HTTP/1\\.[01] \\d\\d\\d.*\\r\\nServer: Product{0}/([\\w.]+)\n'
+
+
+def write_signatures(path, lines:list[str]) -> str:
+    path.write_text(''.join(lines), encoding='latin-1')
+    return str(path)
+
+
+@pytest.fixture
+def large_database(tmp_path):
+    lines = [HTTP_SIGNATURE.format(index) for index in range(2000)]
+    lines.append('GetRequest\thttp\tHTTP\t-\t^HTTP/1\\.[01] \\d\\d\\d\n')
+    return Signature_Database(write_signatures(tmp_path / 'signatures.txt', lines), None)
+
+
+def test_matching_stays_fast_with_thousands_of_signatures(large_database):
+    headers  = b'HTTP/1.1 200 OK\r\n' + b''.join(b'X-Header-%d: value\r\n' % index for index in range(100))
+    unknown  = headers + b'Server: Unknown/1.0\r\n\r\n' + b'x' * 4096
+    known    = headers + b'Server: Product1999/2.4.1\r\n\r\n' + b'x' * 4096
+    large_database._preload()
+
+    start = time.perf_counter()
+    for _ in range(20):
+        assert large_database._match('GetRequest', b'\x00' * 4096) is None
+        assert large_database._match('GetRequest', unknown)['product'] == 'HTTP'
+        assert large_database._match('GetRequest', known) == {'service': 'http', 'product': 'Product1999', 'version': '2.4.1'}
+    assert time.perf_counter() - start < 2
+
+
+def test_unanchored_signature_is_rejected(tmp_path):
+    database = Signature_Database(write_signatures(tmp_path / 'signatures.txt', ['NULL\tssh\tSSH\t-\tSSH-\n']), None)
+    with pytest.raises(ValueError, match='line 1'):
+        database._load()
+
+
+def test_top_level_alternation_is_rejected(tmp_path):
+    database = Signature_Database(write_signatures(tmp_path / 'signatures.txt', ['NULL\tssh\tSSH\t-\t^SSH-|FTP\n']), None)
+    with pytest.raises(ValueError):
+        database._load()
+
+
+def test_required_literal():
+    assert get_required_literal(r'^HTTP/1\.[01] \d\d\d.*\r\nServer: nginx(?:/([\w.]+))?') == '\r\nServer: nginx'
+    assert get_required_literal(r'^.\x00\x00\x00\x0a(?:5\.5\.5-)?([\d.]+)-MariaDB') == '-MariaDB'
+    assert get_required_literal(r'^220-+ Welcome') == ' Welcome'
+    assert get_required_literal(r'^abc?d') == 'ab'
+
+
+def test_tampered_cache_is_ignored(tmp_path):
+    signatures = write_signatures(tmp_path / 'signatures.txt', ['NULL\tssh\tOpenSSH\t$1\t^SSH-[\\d.]+-OpenSSH_([\\w.]+)\n'])
+    cache      = tmp_path / 'cache.json'
+    Signature_Database(signatures, str(cache))._load()
+    content = json.loads(cache.read_text())
+    content['probes']['NULL'][0][3] = '(a+)+$'
+    cache.write_text(json.dumps(content))
+
+    database = Signature_Database(signatures, str(cache))
+    assert database._match('NULL', b'SSH-2.0-OpenSSH_9.6\r\n')['version'] == '9.6'
+    assert database._probes['NULL'][0][3].startswith('^SSH-')
@@ -0,0 +1,29 @@
+import time
+from ttl_cache import TTL_Cache
+
+
+def test_none_is_a_cached_value():
+    cache = TTL_Cache(ttl=60)
+    assert cache._get('missing') == (False, None)
+    cache._set('key', None)
+    assert cache._get('key') == (True, None)
+
+
+def test_entries_expire_with_their_own_ttl():
+    cache = TTL_Cache(ttl=60)
+    cache._set('short', 1, ttl=0.01)
+    cache._set('long', 2)
+    time.sleep(0.02)
+    assert cache._get('short') == (False, None)
+    assert cache._get('long')  == (True, 2)
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTL_Cache(ttl=60, max_size=2)
+    cache._set('a', 1)
+    cache._set('b', 2)
+    cache._get('a')
+    cache._set('c', 3)
+    assert cache._get('b') == (False, None)
+    assert cache._get('a') == (True, 1)
+    assert cache._get('c') == (True, 3)